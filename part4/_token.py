@@ -1,3 +1,6 @@
+import sys
+from array import array
+from collections import deque
 from enum import Enum, auto
 from typing import Any
 
@@ -41,3 +44,118 @@ class Token:
 
     def __repr__(self):
         return f"Token({self.type}, {self.value})"
+
+
+# TokenType members keyed by their value, used to decode compact type codes
+TOKEN_TYPES = {token_type.value: token_type for token_type in TokenType}
+
+# Codes of the tokens whose value is their own lexeme
+_NAME_CODES = frozenset((TokenType.IDENTIFIER.value, TokenType.DEFINITION.value))
+
+
+class TokenBuffer:
+    """
+    A compact, struct-of-arrays alternative to a list of Token objects.
+
+    source: str - The input string the offsets point into.
+    types: array - The TokenType value of each token.
+    starts: array - The index of each token's first character in the source.
+    ends: array - The index just past each token's last character.
+    values: list - The literal value of each NUMBER token, None for the rest.
+
+    Lexemes are not stored; they are sliced out of the source on demand.
+    Indexing the buffer returns a Token view built on the fly, so code that
+    expects a list of tokens keeps working.
+    """
+
+    def __init__(self, source: str):
+        self.source = source
+        self.types = array("B")
+        self.starts = array("Q")
+        self.ends = array("Q")
+        self.values = []
+
+    def append(self, type: TokenType, start: int, end: int, value: Any = None):
+        """Add a token spanning source[start:end]."""
+        self.types.append(type.value)
+        self.starts.append(start)
+        self.ends.append(end)
+        self.values.append(value)
+
+    def type_at(self, index: int) -> TokenType:
+        """Return the type of the token at index without building a Token."""
+        return TOKEN_TYPES[self.types[index]]
+
+    def lexeme_at(self, index: int) -> str:
+        """Return the lexeme of the token at index without building a Token."""
+        return self.source[self.starts[index] : self.ends[index]]
+
+    def value_at(self, index: int) -> Any:
+        """Return the literal value of the token at index without building a Token."""
+        if self.types[index] in _NAME_CODES:
+            # Identifiers carry their own lexeme as their value
+            return self.lexeme_at(index)
+        return self.values[index]
+
+    def __len__(self):
+        return len(self.types)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return Token(self.type_at(index), self.lexeme_at(index), self.value_at(index))
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def __repr__(self):
+        return f"TokenBuffer({len(self)} tokens)"
+
+
+class ByteTokenBuffer(TokenBuffer):
+    """
+    A TokenBuffer whose source is ASCII text in a bytes-like object, such as
+    bytes, a bytearray, an mmap or a memoryview.
+
+    Lexemes are decoded from the buffer only when asked for, and interned so
+    that every occurrence of an identifier shares a single string.
+    """
+
+    def lexeme_at(self, index: int) -> str:
+        return sys.intern(str(self.source[self.starts[index] : self.ends[index]], "ascii"))
+
+
+class TokenStream:
+    """
+    A sliding window over a token iterator that can be indexed like a list.
+
+    Tokens are pulled from the iterator only as far as the parser looks
+    ahead, and dropped once release() says they are no longer needed, so
+    the window stays small no matter how many tokens the iterator yields.
+    """
+
+    def __init__(self, tokens):
+        self._tokens = iter(tokens)
+        self.window = deque()
+        self.offset = 0  # The index of window[0] in the whole token stream
+
+    def __getitem__(self, index: int) -> Token:
+        position = index - self.offset
+        if position < 0:
+            raise IndexError(f"Token {index} has already been released.")
+        while position >= len(self.window):
+            try:
+                self.window.append(next(self._tokens))
+            except StopIteration:
+                raise IndexError(f"Token {index} is past the end of the stream.") from None
+        return self.window[position]
+
+    def release(self, index: int):
+        """Drop every token before the given index."""
+        while self.offset < index and self.window:
+            self.window.popleft()
+            self.offset += 1
+
+    def __repr__(self):
+        return f"TokenStream({len(self.window)} tokens buffered at {self.offset})"
@@ -1,4 +1,4 @@
-from _token import Token, TokenType
+from _token import ByteTokenBuffer, Token, TokenBuffer, TokenType
 from grammar import *
 
 
@@ -10,17 +10,39 @@ class Tokenizer:
     tokens: list - A list of tokens generated from the input string.
     start: int - The starting index of the current token.
     current: int - The current index in the input string.
+    engine: str - "scan" walks the input one character at a time, "table"
+        lexes whole runs at once with the master regex from grammar.py.
+        Both engines produce the same tokens.
 
     """
 
-    def __init__(self, source: str):
+    ENGINES = ("scan", "table")
+
+    def __init__(self, source: str, engine: str = "scan"):
+        if engine not in self.ENGINES:
+            raise ValueError(f"Unknown tokenizer engine: {engine!r}")
         self.source = source
+        self.engine = engine
         self.tokens = []
         self.start = 0
         self.current = 0
 
-    def scan_tokens(self):
-        """Scan the input string and generate a list of tokens."""
+    def scan_tokens(self, buffer: bool = False):
+        """
+        Scan the input string and generate a list of tokens.
+
+        With buffer=True the tokens are returned as a TokenBuffer instead.
+        """
+        if buffer:
+            return self._scan_buffer()
+
+        # _number() keeps consuming anything str.isdigit() accepts, including
+        # non-ASCII digits the regex tables don't list, so such (rare) input
+        # always goes through the scanning engine
+        if self.engine == "table" and self.source.isascii():
+            self.tokens.extend(self._table_tokens())
+            self.tokens.append(Token(TokenType.EOF, "", None))
+            return self.tokens
 
         while not self._is_at_end():
             self.start = self.current
@@ -28,6 +50,26 @@ class Tokenizer:
         self.tokens.append(Token(TokenType.EOF, "", None))
         return self.tokens
 
+    def _scan_buffer(self):
+        """Scan the input string into a TokenBuffer."""
+        tokens = TokenBuffer(self.source)
+
+        if self.engine == "table" and self.source.isascii():
+            _scan_regex(tokens, TOKEN_REGEX, KEYWORDS, SYMBOL_TABLE)
+            self.start = self.current = len(self.source)
+        else:
+            while not self._is_at_end():
+                self.start = self.current
+                self._scan_token()
+                if self.tokens:
+                    token = self.tokens.pop()
+                    # Identifier values are recovered from the source on demand
+                    value = token.value if token.type == TokenType.NUMBER else None
+                    tokens.append(token.type, self.start, self.current, value)
+
+        tokens.append(TokenType.EOF, self.current, self.current)
+        return tokens
+
     def _is_at_end(self):
         """Check if the current position is at the end of the input string."""
         return self.current >= len(self.source)
@@ -85,3 +127,70 @@ class Tokenizer:
 
         value = int(lexeme)
         self.tokens.append(Token(TokenType.NUMBER, lexeme, value))
+
+    def _table_tokens(self):
+        """Lex the whole input with TOKEN_REGEX, one regex match per token."""
+        for number, identifier, symbol, other in TOKEN_REGEX.findall(self.source):
+            if number:
+                yield Token(TokenType.NUMBER, number, int(number))
+            elif identifier:
+                yield Token(KEYWORDS.get(identifier, TokenType.IDENTIFIER), identifier, identifier)
+            elif symbol:
+                yield Token(SYMBOL_TABLE[symbol], symbol)
+            else:
+                raise SyntaxError(f"Unexpected character: {other}")
+
+        self.start = self.current = len(self.source)
+
+
+class ByteTokenizer:
+    """
+    A tokenizer for ASCII source held in bytes, a bytearray, an mmap or a
+    memoryview.
+
+    source: bytes-like - The input buffer to be tokenized.
+
+    The input is never decoded or copied as a whole. Tokens are recorded as
+    offsets into the buffer, and identifiers are only decoded when the parser
+    asks for their text. The tokens are the same ones Tokenizer produces for
+    the decoded source, except that only ASCII digits make up numbers.
+    """
+
+    def __init__(self, source):
+        self.source = source
+
+    def scan_tokens(self):
+        """Scan the input buffer into a ByteTokenBuffer."""
+        tokens = ByteTokenBuffer(self.source)
+        _scan_regex(tokens, BYTE_TOKEN_REGEX, BYTE_KEYWORDS, BYTE_SYMBOL_TABLE)
+        tokens.append(TokenType.EOF, len(self.source), len(self.source))
+        return tokens
+
+
+def _scan_regex(tokens, regex, keywords, symbol_table):
+    """Append every token the master regex finds in tokens.source to the buffer."""
+    types = tokens.types.append
+    starts = tokens.starts.append
+    ends = tokens.ends.append
+    values = tokens.values.append
+
+    for m in regex.finditer(tokens.source):
+        group = m.lastindex
+        start, end = m.span(group)
+        lexeme = m.group(group)
+        if group == 1:
+            types(TokenType.NUMBER.value)
+            values(int(lexeme))
+        elif group == 2:
+            types(keywords.get(lexeme, TokenType.IDENTIFIER).value)
+            values(None)
+        elif group == 3:
+            types(symbol_table[lexeme].value)
+            values(None)
+        else:
+            if not isinstance(lexeme, str):
+                # Report the whole (UTF-8) character rather than its first byte
+                lexeme = bytes(tokens.source[start : start + 4]).decode("utf-8", "replace")[0]
+            raise SyntaxError(f"Unexpected character: {lexeme}")
+        starts(start)
+        ends(end)
@@ -1,68 +1,177 @@
 """Abstract Syntax Tree (AST) for the language."""
 
+import math
+
+# Nodes are frozen, so their constructors bypass __setattr__
+_set = object.__setattr__
+
 
 class Expr:
-    pass
+    """
+    Base class for the nodes of the tree.
+
+    Nodes are immutable and keep their fields in __slots__. Each node hashes
+    its type and fields once, when it is built, reusing its children's
+    hashes, so nodes with the same structure are equal and hash alike and
+    can be used as dictionary keys.
+
+    Subclasses list their fields in __slots__, in constructor order.
+    """
+
+    __slots__ = ("_hash",)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} nodes are immutable.")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} nodes are immutable.")
+
+    def __hash__(self):
+        return self._hash
+
+    def __eq__(self, other):
+        # Compare with an explicit stack so deep trees can't hit the
+        # recursion limit; shared subtrees are skipped by the identity check
+        pending = [(self, other)]
+        while pending:
+            a, b = pending.pop()
+            if a is b:
+                continue
+            if type(a) is not type(b):
+                return False
+            if isinstance(a, Expr):
+                if a._hash != b._hash:
+                    return False
+                pending.extend((getattr(a, name), getattr(b, name)) for name in a.__slots__)
+            elif type(a) is tuple:
+                if len(a) != len(b):
+                    return False
+                pending.extend(zip(a, b))
+            elif a != b or (type(a) is float and math.copysign(1.0, a) != math.copysign(1.0, b)):
+                # 0.0 == -0.0, but they don't evaluate alike
+                return False
+        return True
+
+    def __reduce__(self):
+        return type(self), tuple(getattr(self, name) for name in self.__slots__)
+
+
+def value_key(value):
+    """
+    Return a key for value that equals another value's only if the two
+    evaluate alike: it carries the type, since 1 == 1.0, and a float's
+    sign, since 0.0 == -0.0.
+    """
+    if type(value) is float:
+        return (float, value, math.copysign(1.0, value))
+    return (type(value), value)
 
 
 class Number(Expr):
+    __slots__ = ("value",)
+
     def __init__(self, value: int):
-        self.value = value
+        _set(self, "value", value)
+        # Number(1) and Number(1.0), and Number(0.0) and Number(-0.0),
+        # evaluate differently, so they must not be interchangeable
+        _set(self, "_hash", hash((Number, value_key(value))))
 
     def __repr__(self):
         return f"Number({self.value})"
 
 
 class Variable(Expr):
+    __slots__ = ("name",)
+
     def __init__(self, name: str):
-        self.name = name
+        _set(self, "name", name)
+        _set(self, "_hash", hash((Variable, name)))
 
     def __repr__(self):
         return f"Variable({self.name})"
 
 
 class Binary(Expr):
+    __slots__ = ("left", "operator", "right")
+
     def __init__(self, left: Expr, operator: str, right: Expr):
-        self.left = left
-        self.operator = operator
-        self.right = right
+        _set(self, "left", left)
+        _set(self, "operator", operator)
+        _set(self, "right", right)
+        _set(self, "_hash", hash((Binary, left, operator, right)))
 
     def __repr__(self):
         return f"Binary({self.left}, {self.operator}, {self.right})"
 
 
 class Unary(Expr):
+    __slots__ = ("operator", "operand")
+
     def __init__(self, operator: str, operand: Expr):
-        self.operator = operator
-        self.operand = operand
+        _set(self, "operator", operator)
+        _set(self, "operand", operand)
+        _set(self, "_hash", hash((Unary, operator, operand)))
 
     def __repr__(self):
         return f"Unary({self.operator}, {self.operand})"
 
 
 class Assignment(Expr):
+    __slots__ = ("name", "value")
+
     def __init__(self, name: str, value: Expr):
-        self.name = name
-        self.value = value
+        _set(self, "name", name)
+        _set(self, "value", value)
+        _set(self, "_hash", hash((Assignment, name, value)))
 
     def __repr__(self):
         return f"Assignment({self.name}, {self.value})"
 
 
 class Definition(Expr):
+    __slots__ = ("name", "params", "body")
+
     def __init__(self, name: str, params: list[str], body: Expr):
-        self.name = name
-        self.params = params
-        self.body = body
+        params = tuple(params)
+        _set(self, "name", name)
+        _set(self, "params", params)
+        _set(self, "body", body)
+        _set(self, "_hash", hash((Definition, name, params, body)))
 
     def __repr__(self):
-        return f"Definition({self.name}, {self.params}, {self.body})"
+        return f"Definition({self.name}, {list(self.params)}, {self.body})"
 
 
 class Call(Expr):
+    __slots__ = ("callee", "arguments")
+
     def __init__(self, callee: Expr, arguments: list[Expr]):
-        self.callee = callee
-        self.arguments = arguments
+        arguments = tuple(arguments)
+        _set(self, "callee", callee)
+        _set(self, "arguments", arguments)
+        _set(self, "_hash", hash((Call, callee, arguments)))
 
     def __repr__(self):
-        return f"Call({self.callee}, {self.arguments})"
+        return f"Call({self.callee}, {list(self.arguments)})"
+
+
+class Interner:
+    """
+    Hands out a single shared node for every distinct structure, turning
+    trees with repeated subtrees into DAGs.
+
+    nodes: dict - Every node interned so far, keyed by itself.
+
+    Children must be interned before their parents; equality checks between
+    interned children then stop at the identity test.
+    """
+
+    def __init__(self):
+        self.nodes = {}
+
+    def intern(self, node: Expr) -> Expr:
+        """Return the shared node equal to node, making node it if there is none yet."""
+        return self.nodes.setdefault(node, node)
+
+    def __len__(self):
+        return len(self.nodes)
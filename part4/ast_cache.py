@@ -0,0 +1,226 @@
+import hashlib
+import marshal
+import os
+import struct
+import sys
+from array import array
+
+from _token import TokenType
+from _tokenizer import Tokenizer
+from abstract_syntax_tree import Assignment, Binary, Call, Definition, Expr, Number, Unary, Variable, value_key
+from parser import Parser
+
+CACHE_DIRECTORY = "__mylangcache__"
+CACHE_SUFFIX = ".mlc"
+
+# Bump FORMAT whenever the encoding below changes, so old files are ignored
+MAGIC = b"MLC\0"
+FORMAT = 1
+
+# magic, format, source size, source mtime in nanoseconds, source hash
+_HEADER = struct.Struct("<4sHxxQq16s")
+
+# Statements are stored as one postorder stream of instructions: every node
+# comes after its children, so decoding is a single loop over a stack
+_NONE = 0  # A missing operand, as in "1 +"
+_NUMBER = 1  # arg: index into the numbers
+_VARIABLE = 2  # arg: index into the names
+_BINARY = 3  # arg: operator; pops right, then left
+_UNARY = 4  # arg: operator; pops the operand
+_ASSIGNMENT = 5  # arg: index into the names; pops the value
+_DEFINITION = 6  # arg: index into the signatures; pops the body
+_CALL = 7  # arg: argument count; pops the arguments, then the callee
+
+_OPERATORS = {token_type.value: token_type for token_type in TokenType}
+
+
+def cache_path(source_path: str) -> str:
+    """Return where the cache file for the script at source_path lives."""
+    directory, name = os.path.split(source_path)
+    return os.path.join(directory, CACHE_DIRECTORY, name + CACHE_SUFFIX)
+
+
+def encode(statements) -> bytes:
+    """Serialize a list of statements, without any header."""
+    ops, args = array("B"), array("I")
+    numbers, names, signatures = [], [], []
+    number_index, name_index, signature_index = {}, {}, {}
+
+    def index(table, indices, value):
+        # The key carries the value's type and sign so that 1 and 1.0, and
+        # 0.0 and -0.0, stay apart
+        key = value_key(value)
+        position = indices.get(key)
+        if position is None:
+            position = indices[key] = len(table)
+            table.append(value)
+        return position
+
+    for statement in statements:
+        # Walk each statement with an explicit stack, so deep trees can't hit
+        # the recursion limit. A node is pushed twice: once to push its
+        # children, and once more, after them, to emit it
+        pending = [(statement, False)]
+        while pending:
+            node, children_done = pending.pop()
+            if node is None:
+                ops.append(_NONE)
+                args.append(0)
+            elif isinstance(node, Number):
+                ops.append(_NUMBER)
+                args.append(index(numbers, number_index, node.value))
+            elif isinstance(node, Variable):
+                ops.append(_VARIABLE)
+                args.append(index(names, name_index, node.name))
+            elif not children_done:
+                pending.append((node, True))
+                if isinstance(node, Binary):
+                    pending.append((node.right, False))
+                    pending.append((node.left, False))
+                elif isinstance(node, Unary):
+                    pending.append((node.operand, False))
+                elif isinstance(node, (Assignment, Definition)):
+                    pending.append((node.value if isinstance(node, Assignment) else node.body, False))
+                elif isinstance(node, Call):
+                    pending.extend((argument, False) for argument in reversed(node.arguments))
+                    pending.append((node.callee, False))
+                else:
+                    raise ValueError(f"Cannot encode node: {node!r}")
+            elif isinstance(node, Binary):
+                ops.append(_BINARY)
+                args.append(node.operator.value)
+            elif isinstance(node, Unary):
+                ops.append(_UNARY)
+                args.append(node.operator.value)
+            elif isinstance(node, Assignment):
+                ops.append(_ASSIGNMENT)
+                args.append(index(names, name_index, node.name))
+            elif isinstance(node, Definition):
+                ops.append(_DEFINITION)
+                args.append(index(signatures, signature_index, (node.name, node.params)))
+            else:
+                ops.append(_CALL)
+                args.append(len(node.arguments))
+
+    return marshal.dumps((numbers, names, signatures, ops.tobytes(), args.tobytes()))
+
+
+def decode(data: bytes) -> list[Expr]:
+    """Rebuild the statements serialized by encode()."""
+    numbers, names, signatures, op_bytes, arg_bytes = marshal.loads(data)
+    args = array("I")
+    args.frombytes(arg_bytes)
+
+    # Nodes are immutable, so every use of a number or variable can share one
+    number_nodes = [Number(value) for value in numbers]
+    variable_nodes = [Variable(name) for name in names]
+    operators = _OPERATORS
+
+    stack = []
+    push, pop = stack.append, stack.pop
+    for op, arg in zip(op_bytes, args):
+        if op == _NUMBER:
+            push(number_nodes[arg])
+        elif op == _VARIABLE:
+            push(variable_nodes[arg])
+        elif op == _BINARY:
+            right = pop()
+            push(Binary(pop(), operators[arg], right))
+        elif op == _UNARY:
+            push(Unary(operators[arg], pop()))
+        elif op == _CALL:
+            arguments = stack[len(stack) - arg :]
+            del stack[len(stack) - arg :]
+            push(Call(pop(), arguments))
+        elif op == _ASSIGNMENT:
+            push(Assignment(names[arg], pop()))
+        elif op == _DEFINITION:
+            name, params = signatures[arg]
+            push(Definition(name, params, pop()))
+        elif op == _NONE:
+            push(None)
+        else:
+            raise ValueError(f"Corrupt cache data: unknown instruction {op}.")
+    return stack
+
+
+def load(source_path: str, engine: str = "table", parser_class: type = Parser) -> list[Expr]:
+    """
+    Return the statements of the script at source_path, from its cache file
+    if that is still valid, or else by parsing the script and writing a new
+    cache file for next time.
+
+    A cache file is valid if it was written for a source of the same size
+    and modification time, or failing that, with the same hash, in which
+    case its header is rewritten with the new time so the next load needn't
+    hash the source. A cache file that can't be decoded is treated as
+    missing. Failing to write the cache file (say, in a read-only
+    directory) is not an error.
+    """
+    stat = os.stat(source_path)
+    path = cache_path(source_path)
+    try:
+        with open(path, "rb") as cache_file:
+            data = cache_file.read()
+    except OSError:
+        data = None
+
+    source = None
+    if data is not None and len(data) >= _HEADER.size:
+        magic, version, size, mtime_ns, digest = _HEADER.unpack_from(data)
+        if magic == MAGIC and version == FORMAT and size == stat.st_size:
+            body = memoryview(data)[_HEADER.size :]
+            if mtime_ns == stat.st_mtime_ns:
+                statements = _decode_cached(body)
+                if statements is not None:
+                    return statements
+            else:
+                # The script was touched, but may well be unchanged
+                with open(source_path, "rb") as source_file:
+                    source = source_file.read()
+                if hashlib.blake2b(source, digest_size=16).digest() == digest:
+                    statements = _decode_cached(body)
+                    if statements is not None:
+                        _write(path, _HEADER.pack(MAGIC, FORMAT, size, stat.st_mtime_ns, digest), body)
+                        return statements
+
+    if source is None:
+        with open(source_path, "rb") as source_file:
+            source = source_file.read()
+    tokens = Tokenizer(source.decode("utf-8"), engine).scan_tokens(buffer=True)
+    statements = parser_class(tokens).parse()
+
+    header = _HEADER.pack(
+        MAGIC, FORMAT, len(source), stat.st_mtime_ns, hashlib.blake2b(source, digest_size=16).digest()
+    )
+    _write(path, header, encode(statements))
+    return statements
+
+
+def _decode_cached(data) -> list[Expr]:
+    """Return the statements decoded from a cache file's data, or None if it is truncated or corrupt."""
+    try:
+        return decode(data)
+    except (EOFError, ValueError, TypeError, IndexError, KeyError):
+        return None
+
+
+def _write(path: str, header: bytes, body) -> None:
+    """Write a cache file, ignoring any failure to."""
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temporary file first, so a reader never sees half a file
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "wb") as cache_file:
+            cache_file.write(header)
+            cache_file.write(body)
+        os.replace(temporary, path)
+    except OSError:
+        pass
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        sys.exit("usage: python ast_cache.py SCRIPT...")
+    for source_path in sys.argv[1:]:
+        load(source_path)
@@ -0,0 +1,237 @@
+import argparse
+import csv
+import json
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from _tokenizer import Tokenizer
+from interpreter import Frame, Interpreter
+from parser import Parser
+from resolver import Resolver
+from runner import run
+
+FORMATS = ("csv", "jsonl")
+
+_BUFFER_SIZE = 1 << 20  # Bytes buffered before each write to the output file
+
+
+class Scorer:
+    """
+    Evaluates one target expression for row after row of inputs, each row
+    binding its columns to variables.
+
+    interpreter: Interpreter - Holds the script's variables and functions,
+        with the closure engine.
+    statement: Expr - The target, parsed once.
+    needs: set - The variables the target reads, itself or through the
+        functions it calls. Only these columns of a row are bound, so other
+        columns (an id, a label) needn't be numbers.
+
+    The script runs, and the target is parsed and compiled, once. Each row
+    is then evaluated in a Frame in front of the script's variables, so
+    nothing a row does is seen by the next.
+    """
+
+    def __init__(self, target: str, script=()):
+        self.interpreter = Interpreter("closure")
+        for _ in run(script, self.interpreter):
+            pass
+
+        statements = Parser(Tokenizer(target).scan_tokens()).parse()
+        if len(statements) != 1:
+            raise ValueError(f"Expected one target statement, but got {len(statements)}.")
+        self.statement = statements[0]
+        self.needs = Resolver(functions=self.interpreter.functions).needs(self.statement)
+        self._code = self.interpreter.compiler.compile(self.statement)
+
+    def score(self, row: dict):
+        """Return the target's value with the row's columns as variables."""
+        bindings = [(name, _number(name, row[name])) for name in self.needs if name in row]
+        interpreter = self.interpreter
+        variables = interpreter.variables
+        interpreter.variables = Frame(variables, bindings)
+        try:
+            return self._code()
+        finally:
+            interpreter.variables = variables
+
+
+def score_rows(target: str, rows, script: str = "", workers: int = 1, chunk_size: int = 1024):
+    """
+    Yield (row, the target's value for it) for each row, in order.
+
+    Rows are read and scored chunk_size at a time. With more than one
+    worker, the chunks are scored in that many processes, each of which
+    runs the script and compiles the target once. At most two chunks per
+    worker are read ahead of the results, so memory stays flat however
+    many rows there are. An error is raised with a note of its row's
+    number, counting from 1.
+    """
+    # Built here even with workers, so a bad target or script fails at once
+    scorer = Scorer(target, script.splitlines(True))
+    chunks = _chunks(rows, chunk_size)
+
+    if workers <= 1:
+        first = 1
+        for chunk in chunks:
+            yield from zip(chunk, _score_chunk(scorer, first, chunk))
+            first += len(chunk)
+        return
+
+    with ProcessPoolExecutor(workers, initializer=_start_worker, initargs=(target, script)) as pool:
+        pending = deque()
+        first = 1
+        for chunk in chunks:
+            pending.append((chunk, pool.submit(_score_in_worker, first, chunk)))
+            first += len(chunk)
+            if len(pending) >= 2 * workers:
+                chunk, results = pending.popleft()
+                yield from zip(chunk, results.result())
+        while pending:
+            chunk, results = pending.popleft()
+            yield from zip(chunk, results.result())
+
+
+def read_rows(file, format: str):
+    """
+    Yield the rows of a CSV file (with a header) or a JSONL file, as dicts.
+    A JSONL line that isn't an object is a ValueError naming the line.
+    """
+    if format == "csv":
+        yield from csv.DictReader(file)
+        return
+    for number, line in enumerate(file, 1):
+        if line.strip():
+            row = json.loads(line)
+            if not isinstance(row, dict):
+                raise ValueError(f"Line {number} of the input is not a JSON object: {line.strip()[:40]!r}")
+            yield row
+
+
+def write_rows(file, format: str, pairs, column: str = "result") -> int:
+    """
+    Write each row with its result added as column, and return how many
+    rows were written.
+
+    A CSV file's header is the first row's columns. A later row missing
+    some of them leaves them empty, and one with columns the header
+    doesn't have (as JSONL rows may) is a ValueError, since they would be
+    lost.
+    """
+    count = 0
+    if format == "csv":
+        writer = None
+        for row, result in pairs:
+            if writer is None:
+                fields = list(row) + ([column] if column not in row else [])
+                known = set(fields)
+                writer = csv.DictWriter(file, fields)
+                writer.writeheader()
+            elif not row.keys() <= known:
+                extra = ", ".join(str(name) for name in row if name not in known)
+                raise ValueError(f"Row {count + 1} has columns the CSV header doesn't: {extra}.")
+            writer.writerow({**row, column: result})
+            count += 1
+        return count
+
+    for row, result in pairs:
+        file.write(json.dumps({**row, column: result}, default=str))
+        file.write("\n")
+        count += 1
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python batch.py",
+        description="Evaluate an expression for every row of a CSV or JSONL file.",
+    )
+    parser.add_argument("target", metavar="EXPRESSION", help="the expression to evaluate for each row")
+    parser.add_argument("input", metavar="INPUT", help="the rows, as CSV with a header or as JSONL")
+    parser.add_argument("output", metavar="OUTPUT", help="where to write each row with its result")
+    parser.add_argument("-s", "--script", help="a script of defs and variables to run first")
+    parser.add_argument("-w", "--workers", type=int, default=1, help="processes to score in (default 1)")
+    parser.add_argument("-c", "--chunk-size", type=int, default=1024, help="rows per chunk (default 1024)")
+    parser.add_argument("--column", default="result", help="the column to write results to")
+    parser.add_argument("--input-format", choices=FORMATS, help="default: from the input's extension")
+    parser.add_argument("--output-format", choices=FORMATS, help="default: from the output's extension")
+    args = parser.parse_args(argv)
+    if args.chunk_size < 1:
+        parser.error("the chunk size must be at least 1")
+
+    script = ""
+    if args.script:
+        with open(args.script) as file:
+            script = file.read()
+    input_format = args.input_format or _format_of(args.input)
+    output_format = args.output_format or _format_of(args.output)
+
+    with open(args.input, newline="") as source, open(
+        args.output, "w", newline="", buffering=_BUFFER_SIZE
+    ) as destination:
+        rows = read_rows(source, input_format)
+        pairs = score_rows(args.target, rows, script, args.workers, args.chunk_size)
+        count = write_rows(destination, output_format, pairs, args.column)
+    print(f"scored {count} rows", file=sys.stderr)
+
+
+# The Scorer of a worker process, made once by _start_worker
+_scorer = None
+
+
+def _start_worker(target: str, script: str):
+    global _scorer
+    _scorer = Scorer(target, script.splitlines(True))
+
+
+def _score_in_worker(first: int, rows: list) -> list:
+    return _score_chunk(_scorer, first, rows)
+
+
+def _score_chunk(scorer: Scorer, first: int, rows: list) -> list:
+    """Return the scores of rows, numbered from first."""
+    results = []
+    for number, row in enumerate(rows, first):
+        try:
+            results.append(scorer.score(row))
+        except Exception as error:
+            error.add_note(f"In row {number} of the input.")
+            raise
+    return results
+
+
+def _chunks(rows, size: int):
+    """Yield lists of up to size rows."""
+    rows = iter(rows)
+    while chunk := list(islice(rows, size)):
+        yield chunk
+
+
+def _number(name: str, value):
+    """Return a column's value as a number, parsing it if it is text."""
+    if type(value) in (int, float):
+        return value
+    if isinstance(value, str):
+        try:
+            return int(value)
+        except ValueError:
+            pass
+        try:
+            return float(value)
+        except ValueError:
+            pass
+    raise ValueError(f"Column {name} is not a number: {value!r}")
+
+
+def _format_of(path: str) -> str:
+    if path.endswith(".csv"):
+        return "csv"
+    if path.endswith((".jsonl", ".ndjson", ".json")):
+        return "jsonl"
+    raise ValueError(f"Can't tell the format of {path!r}; pass --input-format or --output-format.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+import math
+import operator
+import time
+
+# How many nodes are evaluated between looks at the clock
+_CLOCK_INTERVAL = 256
+
+
+class BudgetExceededError(RuntimeError):
+    """Raised when an evaluation goes over one of its Budget's limits."""
+
+
+class NodeLimitError(BudgetExceededError):
+    """Raised when an evaluation evaluates more nodes than its budget allows."""
+
+
+class CallLimitError(BudgetExceededError):
+    """Raised when an evaluation makes more function calls than its budget allows."""
+
+
+class SizeLimitError(BudgetExceededError):
+    """Raised before a * or ** would build an integer larger than the budget allows."""
+
+
+class DeadlineError(BudgetExceededError):
+    """Raised when an evaluation runs past its budget's time limit."""
+
+
+class Budget:
+    """
+    Limits on the work a single evaluation may do. Each limit is None for
+    no limit.
+
+    max_nodes: int - The most nodes an evaluation may evaluate, counting
+        every node of a function body each time it is called.
+    max_calls: int - The most function calls an evaluation may make.
+    max_bits: int - The largest integer, in bits, that * or ** may
+        produce. The size is worked out from the operands before the
+        operation runs, so 9 ** 9 ** 9 fails at once instead of taking
+        minutes and gigabytes to compute.
+    timeout: float - The most seconds an evaluation may take.
+    nodes: int - How many nodes the current (or last) evaluation has
+        evaluated.
+    calls: int - How many calls it has made.
+
+    The clock is only read every few hundred nodes. Since no single
+    operation can build an integer past max_bits, the time between
+    readings stays short as well.
+    """
+
+    def __init__(
+        self, max_nodes: int = None, max_calls: int = None, max_bits: int = None, timeout: float = None
+    ):
+        self.max_nodes = max_nodes
+        self.max_calls = max_calls
+        self.max_bits = max_bits
+        self.timeout = timeout
+        self.nodes = 0
+        self.calls = 0
+        self._deadline = None
+        self._until_clock = _CLOCK_INTERVAL
+
+    def start(self):
+        """Start counting for a new evaluation."""
+        self.nodes = 0
+        self.calls = 0
+        self._deadline = None if self.timeout is None else time.monotonic() + self.timeout
+        self._until_clock = _CLOCK_INTERVAL
+
+    def charge_node(self):
+        """Count a node about to be evaluated."""
+        self.nodes += 1
+        if self.max_nodes is not None and self.nodes > self.max_nodes:
+            raise NodeLimitError(f"Evaluation exceeded its budget of {self.max_nodes} nodes.")
+        if self._deadline is not None:
+            self._until_clock -= 1
+            if self._until_clock <= 0:
+                self._until_clock = _CLOCK_INTERVAL
+                if time.monotonic() > self._deadline:
+                    raise DeadlineError(f"Evaluation exceeded its budget of {self.timeout} seconds.")
+
+    def charge_call(self):
+        """Count a function call about to be made."""
+        self.calls += 1
+        if self.max_calls is not None and self.calls > self.max_calls:
+            raise CallLimitError(f"Evaluation exceeded its budget of {self.max_calls} calls.")
+
+    def check_operation(self, operation, left, right):
+        """Raise a SizeLimitError if operation(left, right) would be an integer larger than max_bits."""
+        if self.max_bits is None or type(left) is not int or type(right) is not int:
+            return
+        if operation is operator.mul:
+            # The product has at most this many bits
+            bits = left.bit_length() + right.bit_length()
+        elif operation is operator.pow:
+            if right <= 0 or abs(left) <= 1:
+                # A float, or 0, 1 or -1
+                return
+            # |left| ** right is at least 2 ** right, and right may be too
+            # large to make a float of
+            bits = right + 1 if right >= self.max_bits else math.floor(right * math.log2(abs(left))) + 1
+        else:
+            return
+        if bits > self.max_bits:
+            raise SizeLimitError(f"Evaluation exceeded its budget of {self.max_bits}-bit integers.")
+
+    def __repr__(self):
+        return (
+            f"Budget(max_nodes={self.max_nodes}, max_calls={self.max_calls}, "
+            f"max_bits={self.max_bits}, timeout={self.timeout})"
+        )
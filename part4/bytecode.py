@@ -0,0 +1,271 @@
+from array import array
+
+from _token import TokenType
+from abstract_syntax_tree import Assignment, Binary, Call, Definition, Expr, Number, Unary, Variable, value_key
+from interpreter import Frame
+
+# Every instruction is an opcode followed by one argument
+LOAD_CONST = 0  # Push consts[arg]
+LOAD_VAR = 1  # Push the variable names[arg]
+STORE_VAR = 2  # Set the variable names[arg] to the top of the stack, leaving it there
+BINARY_ADD = 3  # Replace the top two values with their sum, and so on
+BINARY_SUB = 4
+BINARY_MUL = 5
+BINARY_DIV = 6
+BINARY_POW = 7
+NEG = 8  # Negate the top of the stack
+POS = 9  # Apply unary plus to the top of the stack
+LOAD_FUNC = 10  # Push the function named by consts[arg] == (name, argument count)
+CALL = 11  # Call the function under the top arg values with them as its arguments
+DEF = 12  # Define the function in consts[arg] == (Definition, Code), and push None
+FAIL = 13  # Raise a RuntimeError with the message consts[arg]
+RETURN = 14  # Return the top of the stack
+
+OPNAMES = [
+    "LOAD_CONST",
+    "LOAD_VAR",
+    "STORE_VAR",
+    "BINARY_ADD",
+    "BINARY_SUB",
+    "BINARY_MUL",
+    "BINARY_DIV",
+    "BINARY_POW",
+    "NEG",
+    "POS",
+    "LOAD_FUNC",
+    "CALL",
+    "DEF",
+    "FAIL",
+    "RETURN",
+]
+
+BINARY_OPCODES = {
+    TokenType.PLUS: BINARY_ADD,
+    TokenType.MINUS: BINARY_SUB,
+    TokenType.MULTIPLY: BINARY_MUL,
+    TokenType.DIVIDE: BINARY_DIV,
+    TokenType.EXPONENT: BINARY_POW,
+}
+UNARY_OPCODES = {
+    TokenType.MINUS: NEG,
+    TokenType.PLUS: POS,
+}
+
+
+class Code:
+    """
+    A compiled statement or function body.
+
+    instructions: array - Opcode and argument pairs, flattened.
+    consts: list - The constants the instructions refer to.
+    names: list - The variable names the instructions refer to.
+
+    Code objects only hold numbers, strings, tuples, trees and other code
+    objects, so they can be pickled and sent to other processes.
+    """
+
+    def __init__(self, instructions: array, consts: list, names: list):
+        self.instructions = instructions
+        self.consts = consts
+        self.names = names
+
+    def __repr__(self):
+        return f"Code({len(self.instructions) // 2} instructions)"
+
+
+class Compiler:
+    """Compiles a statement into a Code object."""
+
+    def __init__(self):
+        self.instructions = array("I")
+        self.consts = []
+        self.names = []
+        self._const_index = {}
+        self._name_index = {}
+
+    @classmethod
+    def compile(cls, expr: Expr) -> Code:
+        """Compile expr into code that evaluates it and returns its value."""
+        compiler = cls()
+        compiler._compile(expr)
+        compiler._emit(RETURN)
+        return Code(compiler.instructions, compiler.consts, compiler.names)
+
+    def _emit(self, op: int, arg: int = 0):
+        self.instructions.append(op)
+        self.instructions.append(arg)
+
+    def _const(self, value) -> int:
+        # The key carries the type and sign so that 1 and 1.0, and 0.0 and
+        # -0.0, stay apart
+        key = value_key(value)
+        index = self._const_index.get(key)
+        if index is None:
+            index = self._const_index[key] = len(self.consts)
+            self.consts.append(value)
+        return index
+
+    def _name(self, name: str) -> int:
+        index = self._name_index.get(name)
+        if index is None:
+            index = self._name_index[name] = len(self.names)
+            self.names.append(name)
+        return index
+
+    def _compile(self, expr: Expr):
+        if isinstance(expr, Number):
+            self._emit(LOAD_CONST, self._const(expr.value))
+        elif isinstance(expr, Variable):
+            self._emit(LOAD_VAR, self._name(expr.name))
+        elif isinstance(expr, Binary):
+            self._compile(expr.left)
+            self._compile(expr.right)
+            self._emit_operator(BINARY_OPCODES, expr)
+        elif isinstance(expr, Unary):
+            self._compile(expr.operand)
+            self._emit_operator(UNARY_OPCODES, expr)
+        elif isinstance(expr, Assignment):
+            self._compile(expr.value)
+            self._emit(STORE_VAR, self._name(expr.name))
+        elif isinstance(expr, Definition):
+            # The body is compiled along with the def and travels with it
+            self._emit(DEF, self._const((expr, Compiler.compile(expr.body))))
+        elif isinstance(expr, Call):
+            # The function is looked up (and checked) before any argument
+            # is evaluated, as the tree walker does
+            self._emit(LOAD_FUNC, self._const((expr.callee.name, len(expr.arguments))))
+            for argument in expr.arguments:
+                self._compile(argument)
+            self._emit(CALL, len(expr.arguments))
+        else:
+            self._emit(FAIL, self._const(f"Unknown expression: {expr}"))
+
+    def _emit_operator(self, opcodes: dict, expr: Expr):
+        op = opcodes.get(expr.operator)
+        if op is None:
+            self._emit(FAIL, self._const(f"Unknown expression: {expr}"))
+        else:
+            self._emit(op)
+
+
+class VM:
+    """
+    Runs Code objects against an Interpreter's variables and functions.
+
+    interpreter: Interpreter - The interpreter whose state the code reads
+        and writes.
+    bodies: dict - The Definition and compiled body of every function
+        defined so far, keyed by its name.
+
+    Calls don't recurse into Python: the caller's code, position and
+    variables are pushed onto a frame stack, so the depth of nested calls
+    is limited only by memory.
+    """
+
+    def __init__(self, interpreter):
+        self.interpreter = interpreter
+        self.bodies = {}
+
+    def evaluate(self, expr: Expr) -> float:
+        """Compile expr and run it."""
+        return self.run(Compiler.compile(expr))
+
+    def run(self, code: Code) -> float:
+        interpreter, bodies = self.interpreter, self.bodies
+        instructions, consts, names = code.instructions, code.consts, code.names
+        variables = interpreter.variables
+        stack, frames = [], []
+        push, pop = stack.append, stack.pop
+        pc = 0
+
+        try:
+            while True:
+                op = instructions[pc]
+                arg = instructions[pc + 1]
+                pc += 2
+
+                if op == LOAD_VAR:
+                    push(variables[names[arg]])
+                elif op == LOAD_CONST:
+                    push(consts[arg])
+                elif op == STORE_VAR:
+                    variables[names[arg]] = stack[-1]
+                elif op <= BINARY_POW:
+                    right = pop()
+                    if op == BINARY_ADD:
+                        stack[-1] += right
+                    elif op == BINARY_SUB:
+                        stack[-1] -= right
+                    elif op == BINARY_MUL:
+                        stack[-1] *= right
+                    elif op == BINARY_DIV:
+                        stack[-1] /= right
+                    else:
+                        stack[-1] **= right
+                elif op == LOAD_FUNC:
+                    name, count = consts[arg]
+                    function = interpreter.functions.get(name)
+                    if not function or len(function.params) != count:
+                        # Raise the interpreter's own error
+                        interpreter._lookup_function(Variable(name), count)
+                    push(function)
+                elif op == CALL:
+                    arg_vals = stack[len(stack) - arg :]
+                    del stack[len(stack) - arg :]
+                    function = pop()
+                    compiled = bodies.get(function.name)
+                    if compiled is None or compiled[0] is not function:
+                        # Defined without running its def through this VM
+                        compiled = bodies[function.name] = (function, Compiler.compile(function.body))
+
+                    frames.append((instructions, consts, names, pc, variables))
+                    variables = interpreter.variables = Frame(variables, zip(function.params, arg_vals))
+                    code = compiled[1]
+                    instructions, consts, names = code.instructions, code.consts, code.names
+                    pc = 0
+                elif op == RETURN:
+                    if not frames:
+                        return pop()
+                    instructions, consts, names, pc, variables = frames.pop()
+                    interpreter.variables = variables
+                elif op == NEG:
+                    stack[-1] = -stack[-1]
+                elif op == POS:
+                    stack[-1] = +stack[-1]
+                elif op == DEF:
+                    definition, body = consts[arg]
+                    bodies[definition.name] = (definition, body)
+                    interpreter.functions[definition.name] = definition
+                    push(None)
+                elif op == FAIL:
+                    raise RuntimeError(consts[arg])
+                else:
+                    raise RuntimeError(f"Unknown opcode: {op}")
+        finally:
+            # An error in a call leaves the call's variables in place
+            interpreter.variables = frames[0][4] if frames else variables
+
+
+def disassemble(code: Code) -> str:
+    """Return a listing of code's instructions, and those of any function bodies in it."""
+    lines, bodies = [], []
+    instructions = code.instructions
+    for offset in range(0, len(instructions), 2):
+        op, arg = instructions[offset], instructions[offset + 1]
+        line = f"{offset // 2:4} {OPNAMES[op]:<11}"
+        if op == DEF:
+            bodies.append(code.consts[arg])
+            line += f"{arg:4} ({code.consts[arg][0].name})"
+        elif op in (LOAD_CONST, LOAD_FUNC, FAIL):
+            line += f"{arg:4} ({code.consts[arg]!r})"
+        elif op in (LOAD_VAR, STORE_VAR):
+            line += f"{arg:4} ({code.names[arg]})"
+        elif op == CALL:
+            line += f"{arg:4}"
+        lines.append(line.rstrip())
+
+    for definition, body in bodies:
+        lines.append("")
+        lines.append(f"{definition.name}({', '.join(definition.params)}):")
+        lines.append(disassemble(body))
+    return "\n".join(lines)
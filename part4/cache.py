@@ -0,0 +1,72 @@
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    A mapping that evicts its least recently used entries once it holds too
+    many of them, or once their sizes add up to too many bytes.
+
+    max_entries: int - The most entries the cache holds, or None for no limit.
+    max_bytes: int - The most bytes the entries' sizes may add up to, or None
+        for no limit.
+    hits: int - How many lookups found an entry.
+    misses: int - How many lookups found nothing.
+    evictions: int - How many entries were evicted to make room.
+    """
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # key -> (value, size)
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        """Return the value cached under key and mark it most recently used."""
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key, value, size: int = 0):
+        """Cache value under key, charging size bytes against max_bytes."""
+        if key in self.entries:
+            self.size -= self.entries.pop(key)[1]
+        if self.max_bytes is not None and size > self.max_bytes:
+            return  # It would evict everything else and still not fit
+
+        self.entries[key] = (value, size)
+        self.size += size
+        while (self.max_entries is not None and len(self.entries) > self.max_entries) or (
+            self.max_bytes is not None and self.size > self.max_bytes
+        ):
+            _, (_, evicted_size) = self.entries.popitem(last=False)
+            self.size -= evicted_size
+            self.evictions += 1
+
+    def clear(self):
+        """Drop every entry, keeping the counters."""
+        self.entries.clear()
+        self.size = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __repr__(self):
+        return (
+            f"LRUCache({len(self)} entries, {self.size} bytes, hits={self.hits}, "
+            f"misses={self.misses}, evictions={self.evictions})"
+        )
@@ -0,0 +1,93 @@
+import math
+import sys
+
+from abstract_syntax_tree import Definition
+from cache import LRUCache
+from resolver import Resolver, names_used
+
+
+class CallMemo:
+    """
+    Remembers the results of function calls, so a call repeated with the
+    same arguments, in the same surroundings, is answered without running
+    the function again.
+
+    cache: LRUCache - The results. Each is charged the size of its key's
+        values and its own against max_bytes, and the cache's hits, misses
+        and hit_rate report how well memoizing is doing.
+
+    A call's variables vanish when it returns, so all a call can do is
+    return a value, and that value depends only on the function, its
+    arguments, and the variables the call reads from outside (the ones the
+    Resolver says it needs). Those are the key. Values are keyed with
+    their types, since 1 and 1.0 are equal but don't evaluate alike, and
+    floats with their signs too, since 0.0 and -0.0 don't either.
+    Functions whose bodies, or their callees' bodies, define functions do
+    more than return a value, and are never memoized.
+
+    Every def clears the cache: what a call returns depends on the
+    functions it calls too.
+    """
+
+    def __init__(self, functions: dict, max_entries: int = 4096, max_bytes: int = 64 * 1024 * 1024):
+        self.cache = LRUCache(max_entries, max_bytes)
+        self.resolver = Resolver(functions=functions)
+        self._plans = {}  # function name -> names the call needs, or None if impure
+
+    def key(self, function: Definition, arg_vals: list, variables: dict):
+        """Return the key to memoize a call under, or None if the call can't be memoized."""
+        plan = self._plans.get(function.name, False)
+        if plan is False:
+            plan = self._plans[function.name] = self._plan(function.name)
+        if plan is None:
+            return None
+        try:
+            free_vals = tuple([variables[name] for name in plan])
+        except KeyError:
+            return None  # Let the call raise the error
+        arg_vals = tuple(arg_vals)
+        return (
+            function,
+            arg_vals,
+            tuple([_kind(value) for value in arg_vals]),
+            free_vals,
+            tuple([_kind(value) for value in free_vals]),
+        )
+
+    def get(self, key, default=None):
+        return self.cache.get(key, default)
+
+    def put(self, key, value):
+        size = sys.getsizeof(value) + sum(map(sys.getsizeof, key[1])) + sum(map(sys.getsizeof, key[3]))
+        self.cache.put(key, value, size)
+
+    def define(self, definition: Definition):
+        """Forget everything remembered, now that a function has been (re)defined."""
+        self.cache.clear()
+        self.resolver.define(definition)
+        self._plans.clear()
+
+    def _plan(self, name: str):
+        """Return the sorted names a call to the function needs, or None if it isn't pure."""
+        functions = self.resolver.functions
+        seen, pending = {name}, [name]
+        while pending:
+            body = functions[pending.pop()].body
+            if isinstance(body, Definition):
+                return None
+            for callee in names_used(body)[1]:
+                if callee in functions and callee not in seen:
+                    seen.add(callee)
+                    pending.append(callee)
+        return tuple(sorted(self.resolver._needs_of(name)))
+
+    def __repr__(self):
+        return f"CallMemo({self.cache!r})"
+
+
+def _kind(value):
+    """Return what, besides equality, a key must match value on: its type, or a float's sign."""
+    if type(value) is float:
+        # 0.0 == -0.0, but 1 / -0.0 is -inf
+        return math.copysign(1.0, value)
+    return type(value)
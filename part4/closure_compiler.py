@@ -0,0 +1,157 @@
+from abstract_syntax_tree import Assignment, Binary, Call, Definition, Expr, Number, Unary, Variable
+from interpreter import BINARY_OPERATIONS, UNARY_OPERATIONS, Frame
+
+# Stands for a memoized result that wasn't found, since None is a result too
+_MISSING = object()
+
+
+class ClosureCompiler:
+    """
+    Compiles statements into nested Python closures that evaluate them
+    against an Interpreter's variables and functions.
+
+    interpreter: Interpreter - The interpreter whose state the code reads
+        and writes.
+    bodies: dict - The Definition and compiled body of every function
+        defined so far, keyed by its name.
+
+    Everything the tree walker decides per node on every evaluation (the
+    node's type, its operator, which names it reads) is decided once here,
+    so running the code is just a chain of calls. A function's body is
+    compiled once, along with its def, rather than walked on every call.
+
+    The code keeps the tree walker's semantics exactly: names and functions
+    are still looked up when the code runs, in the same order, with the
+    same errors.
+    """
+
+    def __init__(self, interpreter):
+        self.interpreter = interpreter
+        self.bodies = {}
+
+    def compile(self, expr: Expr):
+        """Return a function of no arguments that evaluates expr."""
+        if isinstance(expr, Number):
+            value = expr.value
+            return lambda: value
+
+        if isinstance(expr, Variable):
+            interpreter, name = self.interpreter, expr.name
+            # interpreter.variables is replaced on every call, so it has to
+            # be looked up again each time
+            return lambda: interpreter.variables[name]
+
+        if isinstance(expr, Binary):
+            return self._compile_binary(expr)
+
+        if isinstance(expr, Unary):
+            operand = self.compile(expr.operand)
+            operation = UNARY_OPERATIONS.get(expr.operator)
+            if operation is None:
+                return self._unknown(expr, operand)
+            return lambda: operation(operand())
+
+        if isinstance(expr, Assignment):
+            return self._compile_assignment(expr)
+
+        if isinstance(expr, Definition):
+            return self._compile_definition(expr)
+
+        if isinstance(expr, Call):
+            return self._compile_call(expr)
+
+        def unknown():
+            raise RuntimeError(f"Unknown expression: {expr}")
+
+        return unknown
+
+    def _compile_binary(self, expr: Binary):
+        left = self.compile(expr.left)
+        right = self.compile(expr.right)
+        operation = BINARY_OPERATIONS.get(expr.operator)
+        if operation is None:
+            return self._unknown(expr, left, right)
+
+        # Fold a constant operand into the closure, as in "x * 2"
+        if isinstance(expr.right, Number):
+            constant = expr.right.value
+            return lambda: operation(left(), constant)
+        if isinstance(expr.left, Number):
+            constant = expr.left.value
+            return lambda: operation(constant, right())
+        return lambda: operation(left(), right())
+
+    def _compile_assignment(self, expr: Assignment):
+        interpreter, name = self.interpreter, expr.name
+        value = self.compile(expr.value)
+
+        def assign():
+            result = value()
+            interpreter.variables[name] = result
+            return result
+
+        return assign
+
+    def _compile_definition(self, expr: Definition):
+        interpreter, bodies = self.interpreter, self.bodies
+        body = self.compile(expr.body)
+
+        def define():
+            bodies[expr.name] = (expr, body)
+            interpreter.functions[expr.name] = expr
+            if interpreter.memo is not None:
+                interpreter.memo.define(expr)
+            return None
+
+        return define
+
+    def _compile_call(self, expr: Call):
+        interpreter, bodies = self.interpreter, self.bodies
+        callee, count = expr.callee, len(expr.arguments)
+        name = callee.name
+        arguments = [self.compile(argument) for argument in expr.arguments]
+        memo = interpreter.memo
+
+        def call():
+            function = interpreter.functions.get(name)
+            if not function or len(function.params) != count:
+                # Raise the interpreter's own error
+                interpreter._lookup_function(callee, count)
+            arg_vals = [argument() for argument in arguments]
+
+            key = None
+            if memo is not None:
+                key = memo.key(function, arg_vals, interpreter.variables)
+                if key is not None:
+                    result = memo.get(key, _MISSING)
+                    if result is not _MISSING:
+                        return result
+
+            compiled = bodies.get(name)
+            if compiled is None or compiled[0] is not function:
+                # Defined without running its def through this compiler
+                compiled = bodies[name] = (function, self.compile(function.body))
+
+            local_vars = interpreter.variables
+            interpreter.variables = Frame(local_vars, zip(function.params, arg_vals))
+            try:
+                result = compiled[1]()
+            finally:
+                interpreter.variables = local_vars
+
+            if key is not None:
+                memo.put(key, result)
+            return result
+
+        return call
+
+    @staticmethod
+    def _unknown(expr: Expr, *operands):
+        """Compile a node with an unknown operator, which fails once its operands are evaluated."""
+
+        def unknown():
+            for operand in operands:
+                operand()
+            raise RuntimeError(f"Unknown expression: {expr}")
+
+        return unknown
@@ -0,0 +1,243 @@
+import math
+
+from _token import TokenType
+from abstract_syntax_tree import Assignment, Binary, Call, Definition, Expr, Number, Unary, Variable
+
+# Counts and sizes stop growing here, so estimating stays linear in the
+# size of the program however large the numbers it describes
+HUGE = 2**64
+
+_VISITING = object()  # A function whose callees are still being estimated
+
+
+class Cost:
+    """
+    A static estimate of what evaluating a program would take.
+
+    nodes: int - The nodes in the program, function bodies included.
+    depth: int - The deepest nesting of any statement or function body.
+    fan_out: dict - How many distinct functions each function calls, by
+        name, over all of its defs.
+    evaluated_nodes: int - An upper bound on the nodes evaluating the
+        program would evaluate, counting a body once per call, or None if
+        the program calls a recursive function (which, with no
+        conditionals, never returns).
+    calls: int - An upper bound on the calls it would make, or None.
+    call_depth: int - The longest chain of calls it can make, or None.
+    max_bits: int - An upper bound on the size, in bits, of the integers
+        that operators on literals (and on variables assigned from them)
+        can build, ** and * chains above all, or None if a * or ** has an
+        operand nothing bounds: a parameter, or a call's result.
+
+    Counts and sizes saturate at HUGE.
+    """
+
+    def __init__(self):
+        self.nodes = 0
+        self.depth = 0
+        self.fan_out = {}
+        self.evaluated_nodes = 0
+        self.calls = 0
+        self.call_depth = 0
+        self.max_bits = 0
+
+    @property
+    def max_fan_out(self) -> int:
+        return max(self.fan_out.values(), default=0)
+
+    def within(self, budget) -> bool:
+        """Check that the estimate keeps within a Budget's node, call and integer size limits."""
+        limits = [
+            (self.evaluated_nodes, budget.max_nodes),
+            (self.calls, budget.max_calls),
+            (self.max_bits, budget.max_bits),
+        ]
+        return all(limit is None or (value is not None and value <= limit) for value, limit in limits)
+
+    def __repr__(self):
+        return (
+            f"Cost(nodes={self.nodes}, depth={self.depth}, max_fan_out={self.max_fan_out}, "
+            f"evaluated_nodes={self.evaluated_nodes}, calls={self.calls}, "
+            f"call_depth={self.call_depth}, max_bits={self.max_bits})"
+        )
+
+
+def estimate(statements, functions: dict = None, variables: dict = None) -> Cost:
+    """
+    Return the Cost of evaluating statements after the given functions
+    and variables (an Interpreter's, say), in time linear in their size.
+
+    A call may reach any def of its function's name, so each function is
+    charged for its most expensive def, and a cycle among names counts as
+    recursion even if a redefinition would break it: the estimate is an
+    upper bound. Only top-level statements can assign variables (a call's
+    assignments vanish with it), so their sizes are followed in order.
+    """
+    cost = Cost()
+    bits = {
+        name: value.bit_length() if type(value) is int else 0
+        for name, value in (variables or {}).items()
+        if type(value) in (int, float)
+    }
+
+    found = list((functions or {}).values())  # Defs whose bodies are still to be scanned
+    top = []  # (nodes, {callee: call sites}) for each statement
+    for statement in statements:
+        value_bits, nodes, calls = _scan(statement, cost, bits, found)
+        top.append((nodes, calls))
+        if isinstance(statement, Assignment):
+            if value_bits is None:
+                bits.pop(statement.name, None)
+            else:
+                bits[statement.name] = value_bits
+
+    definitions = {}  # name -> [(body nodes, {callee: call sites})], one for each def
+    while found:
+        definition = found.pop()
+        _, nodes, calls = _scan(definition.body, cost, {}, found)
+        definitions.setdefault(definition.name, []).append((nodes, calls))
+
+    for name, parts in definitions.items():
+        cost.fan_out[name] = len({callee for _, calls in parts for callee in calls})
+
+    cost.evaluated_nodes, cost.calls, cost.call_depth = _combine(top, _per_call(definitions))
+    return cost
+
+
+def _scan(expr: Expr, cost: Cost, bits: dict, found: list):
+    """
+    Walk expr once, adding its nodes and depth to cost and the defs in it
+    to found, and return the bit bound of its value (or None), its node
+    count, and how many times it calls each function.
+    """
+    calls = {}
+    nodes = 0
+    results = []  # The bit bounds of the nodes walked so far, as a stack
+    pending = [(expr, 1, False)]
+    while pending:
+        node, depth, done = pending.pop()
+        if not done:
+            nodes += 1
+            cost.depth = max(cost.depth, depth)
+            pending.append((node, depth, True))
+            if isinstance(node, Binary):
+                pending.append((node.right, depth + 1, False))
+                pending.append((node.left, depth + 1, False))
+            elif isinstance(node, Unary):
+                pending.append((node.operand, depth + 1, False))
+            elif isinstance(node, Assignment):
+                pending.append((node.value, depth + 1, False))
+            elif isinstance(node, Call):
+                calls[node.callee.name] = calls.get(node.callee.name, 0) + 1
+                for argument in reversed(node.arguments):
+                    pending.append((argument, depth + 1, False))
+            elif isinstance(node, Definition):
+                # Its body only runs when it is called
+                found.append(node)
+            continue
+
+        if isinstance(node, Number):
+            results.append(node.value.bit_length() if type(node.value) is int else 0)
+        elif isinstance(node, Variable):
+            results.append(bits.get(node.name))
+        elif isinstance(node, Binary):
+            right = results.pop()
+            left = results.pop()
+            results.append(_binary_bits(node, left, right))
+        elif isinstance(node, Call):
+            del results[len(results) - len(node.arguments) :]
+            results.append(None)
+        elif isinstance(node, Definition):
+            results.append(None)
+        # A Unary or Assignment has its operand's bound, already on the stack
+        if results[-1] is not None:
+            if cost.max_bits is not None:
+                cost.max_bits = max(cost.max_bits, results[-1])
+        elif isinstance(node, Binary) and node.operator in (TokenType.MULTIPLY, TokenType.EXPONENT):
+            # Its operands could be any size, and so could it
+            cost.max_bits = None
+
+    cost.nodes = min(cost.nodes + nodes, HUGE)
+    return results[-1], nodes, calls
+
+
+def _binary_bits(node: Binary, left, right):
+    """Return a bound on the bits of the int node can give, from bounds on its operands'."""
+    if node.operator == TokenType.DIVIDE:
+        # True division always gives a float
+        return 0
+    if node.operator == TokenType.EXPONENT and left is not None and left <= 1:
+        # 0, 1 and -1 keep their size, whatever the exponent
+        return 1
+    if left is None or right is None:
+        return None
+    if node.operator in (TokenType.PLUS, TokenType.MINUS):
+        return min(max(left, right) + 1, HUGE)
+    if node.operator == TokenType.MULTIPLY:
+        return min(left + right, HUGE)
+    if node.operator == TokenType.EXPONENT:
+        if isinstance(node.right, Number):
+            exponent = min(node.right.value, HUGE) if type(node.right.value) is int else 0
+        else:
+            exponent = 2**right - 1 if right < 64 else HUGE
+        if exponent <= 0:
+            # 1, or a float
+            return 1
+        if isinstance(node.left, Number):
+            # The base itself is known, which bounds its powers tightly
+            return min(math.floor(exponent * math.log2(abs(node.left.value))) + 1, HUGE)
+        return min(left * exponent, HUGE)
+    return None
+
+
+def _per_call(definitions: dict) -> dict:
+    """
+    Return a (nodes, calls, call depth) bound for a call to each function,
+    or None for one that can recurse, visiting each call site once.
+    """
+    per_call = {}
+    for root in definitions:
+        if root in per_call:
+            continue
+        per_call[root] = _VISITING
+        stack = [(root, _callees(definitions[root]))]
+        while stack:
+            name, callees = stack[-1]
+            for callee in callees:
+                if callee in definitions and callee not in per_call:
+                    per_call[callee] = _VISITING
+                    stack.append((callee, _callees(definitions[callee])))
+                    break
+            else:
+                # Every callee is done, or still being visited, which means
+                # it calls back into this function
+                stack.pop()
+                bounds = [_combine([part], per_call) for part in definitions[name]]
+                if any(bound[0] is None for bound in bounds):
+                    per_call[name] = None
+                else:
+                    nodes, calls, depth = (max(values) for values in zip(*bounds))
+                    per_call[name] = (nodes, calls, depth + 1)
+    return per_call
+
+
+def _callees(parts):
+    """Return an iterator over the functions some defs of a function call."""
+    return iter([callee for _, calls in parts for callee in calls])
+
+
+def _combine(parts, per_call: dict):
+    """Return a (nodes, calls, call depth) bound for code parts whose calls cost what per_call says."""
+    nodes = calls = depth = 0
+    for part_nodes, part_calls in parts:
+        nodes = min(nodes + part_nodes, HUGE)
+        for callee, sites in part_calls.items():
+            # A function that isn't defined fails at once
+            bound = per_call.get(callee, (0, 0, 1))
+            if bound is None or bound is _VISITING:
+                return None, None, None
+            callee_nodes, callee_calls, callee_depth = bound
+            nodes = min(nodes + sites * callee_nodes, HUGE)
+            calls = min(calls + sites * (1 + callee_calls), HUGE)
+            depth = max(depth, callee_depth)
+    return nodes, calls, depth
@@ -1,3 +1,5 @@
+import re
+
 from _token import TokenType
 
 DIGITS = "0123456789"
@@ -67,3 +69,34 @@ def get_two_char_symbol_type(c):
 def is_whitespace(c):
     """Check if the character is whitespace."""
     return c in WHITESPACE
+
+
+def _build_token_regex():
+    """
+    Build the master regex used by the table-driven tokenizer.
+
+    Each match skips leading whitespace and captures one token in exactly one
+    of four groups: number, identifier, symbol, or a catch-all for characters
+    no other group accepts (trailing whitespace matches nothing at all).
+    Two-character symbols are listed first so "**" wins over "*" the same way
+    it does in the scanning tokenizer.
+    """
+    symbols = sorted(SYMBOL_TABLE, key=len, reverse=True)
+    return re.compile(
+        f"[{re.escape(WHITESPACE)}]*(?:"
+        f"([{DIGITS}]+)"
+        f"|([{IDENTIFIER_START}][{IDENTIFIER_CONTINUE}]*)"
+        f"|({'|'.join(re.escape(s) for s in symbols)})"
+        f"|([^{re.escape(WHITESPACE)}]))"
+    )
+
+
+# Every symbol, one- or two-character, mapped to its token type
+SYMBOL_TABLE = {**SYMBOL_MAP, **TWO_CHAR_SYMBOLS}
+
+TOKEN_REGEX = _build_token_regex()
+
+# The same tables for tokenizing ASCII source held in bytes rather than str
+BYTE_TOKEN_REGEX = re.compile(TOKEN_REGEX.pattern.encode("ascii"))
+BYTE_SYMBOL_TABLE = {symbol.encode("ascii"): token_type for symbol, token_type in SYMBOL_TABLE.items()}
+BYTE_KEYWORDS = {keyword.encode("ascii"): token_type for keyword, token_type in KEYWORDS.items()}
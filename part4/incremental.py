@@ -0,0 +1,185 @@
+from array import array
+from bisect import bisect_left
+
+from _token import TokenType
+from _tokenizer import Tokenizer
+from grammar import KEYWORDS, SYMBOL_TABLE, TOKEN_REGEX
+from parser import Parser
+
+
+class Document:
+    """
+    A source string that stays tokenized and parsed as it is edited.
+
+    source: str - The current text of the document.
+    tokens: TokenBuffer - The tokens of the current text, or None after a
+        tokenizing error.
+    statements: list - The parsed top-level statements.
+    boundaries: list - The index of the first token of each statement,
+        followed by the index where parsing stopped: the EOF token, or the
+        start of the statement that failed to parse.
+
+    An edit only re-tokenizes the text around the edited span, stopping as
+    soon as the new tokens line up with the old ones again, and only
+    re-parses the statements whose tokens (or lookahead token) changed.
+    Every other statement keeps its existing tree.
+    """
+
+    def __init__(self, source: str):
+        self.source = source
+        self.tokens = None
+        self.statements = []
+        self.boundaries = [0]
+        self._rebuild()
+
+    def edit(self, offset: int, deleted: int, inserted: str) -> range:
+        """
+        Replace `deleted` characters at `offset` with the `inserted` text.
+
+        Returns the indices of the statements that were re-parsed. A
+        SyntaxError still applies the edit; the statements before the error
+        stay parsed and the next edit picks up from there.
+        """
+        if offset < 0 or deleted < 0 or offset + deleted > len(self.source):
+            raise ValueError(f"Edit ({offset}, {deleted}) is outside the document.")
+
+        source = self.source[:offset] + inserted + self.source[offset + deleted :]
+        self.source = source
+
+        if self.tokens is None or not source.isascii():
+            # Non-ASCII text can only be tokenized by the scanning engine
+            return self._rebuild()
+
+        first, last, replaced = self._retokenize(offset, offset + deleted, len(inserted) - deleted)
+        return self._reparse(first, last, replaced)
+
+    def _rebuild(self) -> range:
+        """Tokenize and parse the whole document from scratch."""
+        self.statements = []
+        self.boundaries = [0]
+        try:
+            self.tokens = Tokenizer(self.source, engine="table").scan_tokens(buffer=True)
+        except SyntaxError:
+            self.tokens = None
+            raise
+        return self._reparse(0, 0, 0)
+
+    def _retokenize(self, start: int, end: int, delta: int):
+        """
+        Re-tokenize the source around the old span [start, end), which is
+        now `delta` characters longer.
+
+        Returns the index of the first replaced token, the index of the first
+        old token that was kept, and how many new tokens replaced the ones
+        in between.
+        """
+        tokens = self.tokens
+        starts, ends = tokens.starts, tokens.ends
+        eof = len(tokens) - 1
+
+        # A token touching the edit may merge with the new text, so start
+        # from the first token that ends at or after the edit
+        first = bisect_left(ends, start, 0, eof)
+        position = min(starts[first], start)
+
+        # Old tokens starting after the edit are candidates to line up with
+        kept = bisect_left(starts, end, first, eof)
+
+        types, new_starts, new_ends, values = array("B"), array("Q"), array("Q"), []
+        for m in TOKEN_REGEX.finditer(self.source, position):
+            group = m.lastindex
+            token_start, token_end = m.span(group)
+
+            # From a token boundary the unchanged text after the edit tokenizes
+            # exactly as before, so the rest of the old tokens can be kept
+            old_start = token_start - delta
+            while kept < eof and starts[kept] < old_start:
+                kept += 1
+            if kept < eof and starts[kept] == old_start:
+                break
+
+            lexeme = m.group(group)
+            if group == 1:
+                types.append(TokenType.NUMBER.value)
+                values.append(int(lexeme))
+            elif group == 2:
+                types.append(KEYWORDS.get(lexeme, TokenType.IDENTIFIER).value)
+                values.append(None)
+            elif group == 3:
+                types.append(SYMBOL_TABLE[lexeme].value)
+                values.append(None)
+            else:
+                self.tokens = None
+                self.statements = []
+                self.boundaries = [0]
+                raise SyntaxError(f"Unexpected character: {lexeme}")
+            new_starts.append(token_start)
+            new_ends.append(token_end)
+        else:
+            kept = eof
+
+        if delta:
+            shift = delta.__add__
+            new_starts.extend(map(shift, starts[kept:]))
+            new_ends.extend(map(shift, ends[kept:]))
+        else:
+            new_starts.extend(starts[kept:])
+            new_ends.extend(ends[kept:])
+
+        tokens.source = self.source
+        tokens.types[first:kept] = types
+        tokens.values[first:kept] = values
+        starts[first:] = new_starts
+        ends[first:] = new_ends
+        return first, kept, len(types)
+
+    def _reparse(self, first: int, kept: int, replaced: int) -> range:
+        """
+        Re-parse the statements affected by replacing the old tokens
+        [first, kept) with `replaced` new tokens.
+        """
+        statements, boundaries = self.statements, self.boundaries
+        shift = replaced - (kept - first)
+        count = len(statements)
+
+        # A statement is affected if any token it read, including the one
+        # token of lookahead that told it to stop, was replaced
+        index = bisect_left(boundaries, first, 1) - 1
+        parser = Parser(self.tokens)
+        parser.current = boundaries[index]
+
+        # Old statements starting after the replaced tokens can be reused
+        # as soon as parsing reaches one of them
+        reuse = bisect_left(boundaries, kept, index + 1, count)
+        if boundaries[-1] + shift != len(self.tokens) - 1:
+            # The last parse stopped at an error rather than at EOF, so the
+            # statements after the edit have to be parsed up to that point
+            # again before any of them can be trusted
+            reuse = count
+
+        new_statements, new_boundaries = [], []
+        try:
+            while not parser._is_at_end():
+                if reuse < count and boundaries[reuse] + shift == parser.current:
+                    break
+                start = parser.current
+                statement = parser.statement()
+                if parser.current == start:
+                    raise SyntaxError(f"Unexpected token: {parser._lexeme_at(start)!r}")
+                new_statements.append(statement)
+                new_boundaries.append(start)
+                while reuse < count and boundaries[reuse] + shift < parser.current:
+                    reuse += 1
+            else:
+                reuse = count
+        except SyntaxError:
+            statements[index:] = new_statements
+            boundaries[index:] = new_boundaries + [start]
+            raise
+
+        statements[index:reuse] = new_statements
+        boundaries[index:] = new_boundaries + [boundary + shift for boundary in boundaries[reuse:]]
+        if reuse == count:
+            # Statements stop where the tokens do
+            boundaries[-1] = len(self.tokens) - 1
+        return range(index, index + len(new_statements))
@@ -0,0 +1,206 @@
+from abstract_syntax_tree import Assignment, Binary, Call, Definition, Expr, Number, Unary, Variable
+
+
+class Inliner:
+    """
+    Replaces calls to small functions inside function bodies with the
+    function's body, so they no longer pay for the arity check, the
+    argument list and the frame each time the body runs. Calls in
+    top-level statements run once, and are left alone: inlining them would
+    cost about as much as it saves.
+
+    max_size: int - The most nodes a body may have to be inlined.
+    leaves: dict - The functions that can be inlined, by name: those whose
+        body (after inlining into it) has no calls, assignments or defs and
+        is at most max_size nodes. Having no calls, none is recursive.
+    inlined: int - How many calls were replaced by a body.
+    reinlined: int - How many defs were emitted again after a function
+        they inlined was redefined.
+
+    Statements must be inlined in the order they will run. Variables are
+    dynamically scoped, so a body reads its free variables from wherever
+    it is called, and substituting the arguments for its parameters at
+    the call site changes nothing, as long as each argument is a number or
+    a variable the body reads (a variable it ignores could be missing, and
+    the call would raise). A missing variable still raises the same
+    KeyError, though a body may read another missing variable first.
+
+    A def inlined into runs whenever it is called, with whatever its
+    callees are by then. So when a function is redefined, every def that
+    inlined it, directly or through another function, is emitted again
+    after the new def, with its original body inlined afresh. A function
+    that is also defined inside a function body may be redefined at any
+    time, so it is never inlined, and nothing is inlined into its defs.
+    """
+
+    def __init__(self, max_size: int = 16):
+        self.max_size = max_size
+        self.leaves = {}
+        self.inlined = 0
+        self.reinlined = 0
+        self._definitions = {}  # name -> (original def, emitted def), for every top-level def
+        self._dependents = {}  # name -> the functions whose emitted def inlined it
+        self._callees = {}  # name -> the functions its emitted def inlined
+        self._volatile = set()  # The functions defined inside function bodies
+        self._leaf_reads = {}  # name -> the variables the body of a leaf reads
+
+    def inline(self, statements) -> list[Expr]:
+        """Return the inlined statements, with any defs emitted again among them."""
+        inlined = []
+        for statement in statements:
+            inlined.extend(self.inline_statement(statement))
+        return inlined
+
+    def inline_statement(self, statement: Expr) -> list[Expr]:
+        """
+        Return the inlined statement, followed by the defs that have to be
+        emitted again after it because it changed a function they inlined.
+        """
+        if not isinstance(statement, Definition):
+            return [statement]
+
+        # Everything that inlined a changed function, directly or not, is stale
+        nested = _nested_definitions(statement) - self._volatile
+        stale, pending = set(), [statement.name, *nested]
+        while pending:
+            name = pending.pop()
+            if name not in stale:
+                stale.add(name)
+                pending.extend(self._dependents.get(name, ()))
+        for name in stale:
+            self.leaves.pop(name, None)
+        self._volatile |= nested
+
+        self._definitions.pop(statement.name, None)
+        redo = [name for name in self._definitions if name in stale]
+        statements = [self._define(statement)]
+
+        # Inline the stale defs afresh in the order they were defined, so
+        # each one's callees are done before it
+        for name in redo:
+            original, emitted = self._definitions.pop(name)
+            definition = self._define(original)
+            if definition != emitted:
+                statements.append(definition)
+                self.reinlined += 1
+        return statements
+
+    def _define(self, definition: Definition) -> Definition:
+        """Inline into a top-level def, and note whether it can be inlined in turn."""
+        name = definition.name
+        for callee in self._callees.pop(name, ()):
+            self._dependents[callee].discard(name)
+
+        if name in self._volatile:
+            emitted = definition
+        else:
+            body = self._inline(definition.body, name)
+            emitted = definition if body is definition.body else Definition(name, definition.params, body)
+            size = _leaf_size(body)
+            if size is not None and size <= self.max_size:
+                self.leaves[name] = emitted
+                self._leaf_reads[name] = _reads(body)
+
+        self._definitions[name] = (definition, emitted)
+        return emitted
+
+    def _inline(self, expr: Expr, definer: str) -> Expr:
+        """Return expr with its calls to leaves inlined, noting them as callees of definer."""
+        if isinstance(expr, Binary):
+            left = self._inline(expr.left, definer)
+            right = self._inline(expr.right, definer)
+            if left is expr.left and right is expr.right:
+                return expr
+            return Binary(left, expr.operator, right)
+
+        if isinstance(expr, Unary):
+            operand = self._inline(expr.operand, definer)
+            if operand is expr.operand:
+                return expr
+            return Unary(expr.operator, operand)
+
+        if isinstance(expr, Assignment):
+            value = self._inline(expr.value, definer)
+            if value is expr.value:
+                return expr
+            return Assignment(expr.name, value)
+
+        if isinstance(expr, Call):
+            arguments = [self._inline(argument, definer) for argument in expr.arguments]
+            inlined = self._inline_call(expr.callee.name, arguments, definer)
+            if inlined is not None:
+                return inlined
+            if all(new is old for new, old in zip(arguments, expr.arguments)):
+                return expr
+            return Call(expr.callee, arguments)
+
+        # Numbers and variables stay as they are, and so do defs inside
+        # bodies: they run later, against whatever is defined by then
+        return expr
+
+    def _inline_call(self, name: str, arguments: list[Expr], definer: str) -> Expr:
+        """Return the body of a call to a leaf with the arguments in place, or None if it can't be inlined."""
+        function = self.leaves.get(name)
+        if function is None or len(function.params) != len(arguments):
+            return None
+        reads = self._leaf_reads[name]
+        for param, argument in zip(function.params, arguments):
+            if not (isinstance(argument, Number) or isinstance(argument, Variable) and param in reads):
+                return None
+
+        self._callees.setdefault(definer, set()).add(name)
+        self._dependents.setdefault(name, set()).add(definer)
+        self.inlined += 1
+        return _substitute(function.body, dict(zip(function.params, arguments)))
+
+
+def _nested_definitions(statement: Expr) -> set:
+    """Return the names of the functions defined inside statement's function bodies."""
+    names = set()
+    while isinstance(statement, Definition):
+        statement = statement.body
+        if isinstance(statement, Definition):
+            names.add(statement.name)
+    return names
+
+
+def _leaf_size(expr: Expr):
+    """Return how many nodes expr has, or None if it calls, assigns or defines anything."""
+    size, pending = 0, [expr]
+    while pending:
+        node = pending.pop()
+        size += 1
+        if isinstance(node, Binary):
+            pending.append(node.left)
+            pending.append(node.right)
+        elif isinstance(node, Unary):
+            pending.append(node.operand)
+        elif not isinstance(node, (Number, Variable)):
+            return None
+    return size
+
+
+def _reads(expr: Expr) -> set:
+    """Return the variables a leaf expression reads."""
+    reads, pending = set(), [expr]
+    while pending:
+        node = pending.pop()
+        if isinstance(node, Variable):
+            reads.add(node.name)
+        elif isinstance(node, Binary):
+            pending.append(node.left)
+            pending.append(node.right)
+        elif isinstance(node, Unary):
+            pending.append(node.operand)
+    return reads
+
+
+def _substitute(expr: Expr, arguments: dict) -> Expr:
+    """Return a leaf expression with its parameters replaced by the arguments."""
+    if isinstance(expr, Variable):
+        return arguments.get(expr.name, expr)
+    if isinstance(expr, Binary):
+        return Binary(_substitute(expr.left, arguments), expr.operator, _substitute(expr.right, arguments))
+    if isinstance(expr, Unary):
+        return Unary(expr.operator, _substitute(expr.operand, arguments))
+    return expr
@@ -1,4 +1,7 @@
+import operator
+
 from _token import TokenType
+from budget import Budget
 from abstract_syntax_tree import (
     Expr,
     Number,
@@ -11,25 +14,295 @@ from abstract_syntax_tree import (
 )
 
 
+# Work items the stack engine pushes to finish a node once its operands
+# have been evaluated
+_BINARY = 0
+_UNARY = 1
+_ASSIGN = 2
+_CALL = 3
+_RETURN = 4
+_UNKNOWN = 5
+
+# Nodes whose values are worth reusing when reuse_shared is on
+_SHAREABLE = (Binary, Unary, Call)
+
+# The most values reuse_shared remembers before starting afresh
+_MAX_SHARED_VALUES = 1 << 16
+
+# Stands for a result that wasn't found, since None is a result too
+_MISSING = object()
+
+BINARY_OPERATIONS = {
+    TokenType.PLUS: operator.add,
+    TokenType.MINUS: operator.sub,
+    TokenType.MULTIPLY: operator.mul,
+    TokenType.DIVIDE: operator.truediv,
+    TokenType.EXPONENT: operator.pow,
+}
+UNARY_OPERATIONS = {
+    TokenType.MINUS: operator.neg,
+    TokenType.PLUS: operator.pos,
+}
+
+
+class Frame(dict):
+    """
+    The variables of a function call: its parameters, and anything its body
+    assigns, in front of its caller's variables.
+
+    parent: dict - The caller's variables, a Frame itself for a nested call.
+
+    Names the frame doesn't hold are looked up in its parent, and so on out
+    to the top-level variables. Assignments stay in the frame and vanish
+    with it when the call returns. Calls see exactly what they would if
+    the caller's variables were copied, but making a frame costs the same
+    however many variables the session holds.
+    """
+
+    __slots__ = ("parent",)
+
+    def __init__(self, parent: dict, bindings=()):
+        super().__init__(bindings)
+        self.parent = parent
+
+    def __missing__(self, name):
+        # Walk the chain in a loop, so deeply nested calls can't hit the
+        # recursion limit
+        frame = self.parent
+        while type(frame) is Frame:
+            if name in frame:
+                return dict.__getitem__(frame, name)
+            frame = frame.parent
+        return frame[name]
+
+
 class Interpreter:
-    def __init__(self):
+    """
+    Evaluates parsed statements, keeping variables and functions between them.
+
+    engine: str - "tree" evaluates by walking the tree recursively, "stack"
+        walks it with explicit work and value stacks, so nesting depth is
+        limited only by memory. "closure" compiles each statement into
+        nested Python closures first, and each function body once, when its
+        def runs (see ClosureCompiler). "bytecode" compiles them into
+        instructions for a stack machine instead (see bytecode.VM), and
+        "python" translates them into Python and compiles that (see
+        PythonBackend). All of them give the same results. "slots" compiles
+        like "closure", but with parameters read from fixed slots, and
+        checks each statement with a Resolver first, raising a NameError
+        for a variable that would be missing rather than a KeyError.
+    reuse_shared: bool - With the tree engine, remember the value of every
+        operator and call node until the variables or functions change, so
+        a subtree shared (or repeated) within a statement, as an Interner
+        produces, is only evaluated once. Values are forgotten once they
+        are stale, or once there are too many of them.
+    memoize: bool - With the tree or closure engine, remember what each
+        call returned, and answer the same call in the same surroundings
+        from memory (see CallMemo). memo holds the CallMemo, or None.
+    budget: Budget - With the tree or stack engine, limits on the nodes,
+        calls, integer sizes and time each evaluate() may use, past which
+        it raises a BudgetExceededError. Whatever it raises, the variables
+        are as they were before it.
+
+    evaluate_batch() evaluates a statement over whole columns of inputs at
+    once, with NumPy (see BatchEvaluator), and prepare() compiles source
+    once to run with many sets of parameters (see PreparedStatement),
+    whatever the engine, but neither keeps to a budget. estimate() says
+    what a program would cost before it runs (see Cost).
+    """
+
+    ENGINES = ("tree", "stack", "closure", "bytecode", "python", "slots")
+
+    def __init__(
+        self, engine: str = "tree", reuse_shared: bool = False, memoize: bool = False, budget: Budget = None
+    ):
+        if engine not in self.ENGINES:
+            raise ValueError(f"Unknown interpreter engine: {engine!r}")
+        if reuse_shared and engine != "tree":
+            raise ValueError("reuse_shared needs the tree engine.")
+        if memoize and engine not in ("tree", "closure"):
+            raise ValueError("memoize needs the tree or closure engine.")
+        if budget is not None and (engine not in ("tree", "stack") or reuse_shared):
+            raise ValueError("budget needs the tree or stack engine, without reuse_shared.")
+        self.engine = engine
         self.variables = {}
         self.functions = {}
 
+        # Bumped whenever the variables or functions change, which makes
+        # every remembered value stale
+        self.state = 0
+        self.shared_values = {}  # node -> value, all as of shared_state
+        self.shared_state = 0
+        if reuse_shared:
+            self._evaluate_tree = self._evaluate_shared
+        self.budget = budget
+        if budget is not None:
+            self._evaluate_tree = self._evaluate_budgeted
+
+        self.batch = None  # The BatchEvaluator, once evaluate_batch() has been called
+        self.memo = None
+        if memoize:
+            # Imported here, since the memo's resolver needs this module
+            from call_memo import CallMemo
+
+            self.memo = CallMemo(self.functions)
+
+        if engine == "closure":
+            # Imported here, since the compiler needs this module's tables
+            from closure_compiler import ClosureCompiler
+
+            self.compiler = ClosureCompiler(self)
+        elif engine == "bytecode":
+            from bytecode import VM
+
+            self.vm = VM(self)
+        elif engine == "python":
+            from python_backend import PythonBackend
+
+            self.backend = PythonBackend(self)
+        elif engine == "slots":
+            from resolver import Resolver, SlotCompiler
+
+            self.resolver = Resolver()
+            self.compiler = SlotCompiler(self)
+
     def evaluate(self, expr: Expr) -> float:
+        if self.budget is not None:
+            return self._evaluate_within_budget(expr)
+        if self.engine == "stack":
+            return self._evaluate_stack(expr)
+        if self.engine == "closure":
+            return self.compiler.compile(expr)()
+        if self.engine == "bytecode":
+            return self.vm.evaluate(expr)
+        if self.engine == "python":
+            return self.backend.evaluate(expr)
+        if self.engine == "slots":
+            self.resolver.check(expr)
+            result = self.compiler.compile(expr)()
+            self.resolver.record(expr)
+            return result
+        return self._evaluate_tree(expr)
+
+    def evaluate_batch(self, statement, /, **columns):
+        """
+        Return the results of evaluating statement (or its source) once per
+        row, with the row's values of the columns as variables, as a NumPy
+        array. Needs numpy, and a session without a budget, since whole
+        columns are evaluated at once without charging it.
+        """
+        if self.budget is not None:
+            raise ValueError("Batch evaluation can't keep to a budget.")
+        if self.batch is None:
+            # Imported here, since the evaluator needs this module
+            from vectorized import BatchEvaluator
+
+            self.batch = BatchEvaluator(self)
+        return self.batch.evaluate(statement, columns)
+
+    def prepare(self, source: str, params=()):
+        """
+        Return a PreparedStatement whose run(**values) evaluates source
+        with params bound to the values, without parsing it again. Needs a
+        session without a budget, since the statement is compiled, like the
+        engines a budget can't be used with.
+        """
+        if self.budget is not None:
+            raise ValueError("Prepared statements can't keep to a budget.")
+        # Imported here, since the compiler needs this module's tables
+        from prepared import PreparedStatement
+
+        return PreparedStatement(self, source, params)
+
+    def estimate(self, program):
+        """
+        Return a static Cost of evaluating program (statements, or their
+        source) in this session, without running it, in time linear in its
+        size (see cost.estimate).
+        """
+        # Imported here, like the engines, since most sessions never need them
+        from cost import estimate
+
+        if isinstance(program, str):
+            from _tokenizer import Tokenizer
+            from parser import Parser
+
+            program = Parser(Tokenizer(program).scan_tokens()).parse()
+        return estimate(program, self.functions, self.variables)
+
+    def _lookup_function(self, callee: Variable, count: int) -> Definition:
+        """Return the function a call refers to, checking it takes count arguments."""
+        function = self.functions.get(callee.name)
+        if not function:
+            raise RuntimeError(f"Function {callee.name} not defined.")
+        if count != len(function.params):
+            raise RuntimeError(
+                f"Function {callee} takes {len(function.params)} arguments, but got {count}."
+            )
+        return function
+
+    def _evaluate_within_budget(self, expr: Expr) -> float:
+        """Evaluate with the budget started afresh, restoring the variables if it raises."""
+        self.budget.start()
+        variables = self.variables
+        try:
+            if self.engine == "stack":
+                return self._evaluate_stack(expr)
+            return self._evaluate_tree(expr)
+        finally:
+            # It may have run out, or failed, in the middle of a call
+            self.variables = variables
+
+    def _evaluate_budgeted(self, expr: Expr) -> float:
+        """Evaluate like _evaluate_tree(), charging every node and call to the budget."""
+        budget = self.budget
+        budget.charge_node()
+        if isinstance(expr, Binary):
+            left = self._evaluate_tree(expr.left)
+            right = self._evaluate_tree(expr.right)
+            operation = BINARY_OPERATIONS.get(expr.operator)
+            if operation is None:
+                raise RuntimeError(f"Unknown expression: {expr}")
+            budget.check_operation(operation, left, right)
+            return operation(left, right)
+        if isinstance(expr, Call):
+            budget.charge_call()
+        return Interpreter._evaluate_tree(self, expr)
+
+    def _evaluate_shared(self, expr: Expr) -> float:
+        """
+        Evaluate like _evaluate_tree(), reusing the value of an equal node
+        evaluated since the variables and functions last changed.
+        """
+        if type(expr) not in _SHAREABLE:
+            return Interpreter._evaluate_tree(self, expr)
+
+        if self.shared_state == self.state:
+            value = self.shared_values.get(expr, _MISSING)
+            if value is not _MISSING:
+                return value
+        value = Interpreter._evaluate_tree(self, expr)
+        if self.shared_state != self.state or len(self.shared_values) >= _MAX_SHARED_VALUES:
+            # The values remembered are stale, or too many to keep
+            self.shared_values.clear()
+            self.shared_state = self.state
+        self.shared_values[expr] = value
+        return value
+
+    def _evaluate_tree(self, expr: Expr) -> float:
         if isinstance(expr, Number):
             return expr.value
 
         if isinstance(expr, Unary):
-            right = self.evaluate(expr.operand)
+            right = self._evaluate_tree(expr.operand)
             if expr.operator == TokenType.MINUS:
                 return -right
             if expr.operator == TokenType.PLUS:
                 return +right
 
         if isinstance(expr, Binary):
-            left = self.evaluate(expr.left)
-            right = self.evaluate(expr.right)
+            left = self._evaluate_tree(expr.left)
+            right = self._evaluate_tree(expr.right)
 
             if expr.operator == TokenType.PLUS:
                 return left + right
@@ -43,8 +316,9 @@ class Interpreter:
                 return left**right
 
         if isinstance(expr, Assignment):
-            val = self.evaluate(expr.value)
+            val = self._evaluate_tree(expr.value)
             self.variables[expr.name] = val
+            self.state += 1
             return val
 
         if isinstance(expr, Variable):
@@ -52,23 +326,108 @@ class Interpreter:
 
         if isinstance(expr, Definition):
             self.functions[expr.name] = expr
+            self.state += 1
+            if self.memo is not None:
+                self.memo.define(expr)
             return None
 
         if isinstance(expr, Call):
-            function = self.functions.get(expr.callee.name)
-            if not function:
-                raise RuntimeError(f"Function {expr.callee.name} not defined.")
-            if len(expr.arguments) != len(function.params):
-                raise RuntimeError(
-                    f"Function {expr.callee} takes {len(function.params)} arguments, but got {len(expr.arguments)}."
-                )
-            arg_vals = [self.evaluate(arg) for arg in expr.arguments]
-            local_vars = self.variables.copy()
-
-            self.variables.update(zip(function.params, arg_vals))
-            result = self.evaluate(function.body)
-            self.variables = local_vars
+            function = self._lookup_function(expr.callee, len(expr.arguments))
+            arg_vals = [self._evaluate_tree(arg) for arg in expr.arguments]
+            key = None
+            if self.memo is not None:
+                key = self.memo.key(function, arg_vals, self.variables)
+                if key is not None:
+                    result = self.memo.get(key, _MISSING)
+                    if result is not _MISSING:
+                        return result
+            local_vars = self.variables
 
+            self.variables = Frame(local_vars, zip(function.params, arg_vals))
+            self.state += 1
+            try:
+                result = self._evaluate_tree(function.body)
+            finally:
+                # Even if the body raises, the call's variables go with it
+                self.variables = local_vars
+                self.state += 1
+
+            if key is not None:
+                self.memo.put(key, result)
             return result
 
         raise RuntimeError(f"Unknown expression: {expr}")
+
+    def _evaluate_stack(self, expr: Expr) -> float:
+        """
+        Evaluate without recursion: nodes are pushed onto a work stack, their
+        operands are pushed on top of them, and a work item left underneath
+        finishes the node once the operands' values are on the value stack.
+        """
+        work = [expr]
+        values = []
+        budget = self.budget
+        variables = self.variables
+        try:
+            while work:
+                item = work.pop()
+                kind = type(item)
+
+                if kind is tuple:
+                    code, payload = item
+                    if code == _BINARY:
+                        right = values.pop()
+                        if budget is not None:
+                            budget.check_operation(payload, values[-1], right)
+                        values[-1] = payload(values[-1], right)
+                    elif code == _UNARY:
+                        values[-1] = payload(values[-1])
+                    elif code == _ASSIGN:
+                        self.variables[payload] = values[-1]
+                    elif code == _CALL:
+                        count = len(payload.params)
+                        arg_vals = values[len(values) - count :]
+                        del values[len(values) - count :]
+                        work.append((_RETURN, self.variables))
+                        self.variables = Frame(self.variables, zip(payload.params, arg_vals))
+                        work.append(payload.body)
+                    elif code == _RETURN:
+                        self.variables = payload
+                    else:
+                        raise RuntimeError(f"Unknown expression: {payload}")
+                    continue
+
+                if budget is not None:
+                    budget.charge_node()
+                    if kind is Call:
+                        budget.charge_call()
+                if kind is Number:
+                    values.append(item.value)
+                elif kind is Variable:
+                    values.append(self.variables[item.name])
+                elif kind is Binary:
+                    operation = BINARY_OPERATIONS.get(item.operator)
+                    work.append((_BINARY, operation) if operation else (_UNKNOWN, item))
+                    work.append(item.right)
+                    work.append(item.left)
+                elif kind is Unary:
+                    operation = UNARY_OPERATIONS.get(item.operator)
+                    work.append((_UNARY, operation) if operation else (_UNKNOWN, item))
+                    work.append(item.operand)
+                elif kind is Call:
+                    function = self._lookup_function(item.callee, len(item.arguments))
+                    work.append((_CALL, function))
+                    work.extend(reversed(item.arguments))
+                elif kind is Assignment:
+                    work.append((_ASSIGN, item.name))
+                    work.append(item.value)
+                elif kind is Definition:
+                    self.functions[item.name] = item
+                    values.append(None)
+                else:
+                    raise RuntimeError(f"Unknown expression: {item}")
+
+            return values.pop()
+        finally:
+            # An error in a call leaves the call's variables in place
+            self.variables = variables
@@ -0,0 +1,145 @@
+from _token import TokenType
+from abstract_syntax_tree import Assignment, Binary, Call, Definition, Expr, Number, Unary, Variable
+from interpreter import BINARY_OPERATIONS, UNARY_OPERATIONS
+
+
+class Optimizer:
+    """
+    Folds constant arithmetic and propagates variables assigned constants.
+
+    max_bits: int - The largest integer, in bits, a fold may produce.
+        Anything larger (say, 2 ** 10 ** 9) is left for run time, so
+        optimizing stays cheap whatever the program.
+    constants: dict - The variables known to hold a constant, by name.
+    folds: list - (original expression, value) for every subtree folded
+        into a number.
+    propagated: int - How many variable reads were replaced by constants.
+
+    Statements must be optimized in the order they will run. Only top-level
+    reads are propagated: function bodies read their variables at call
+    time, from whoever called them, so only their literal arithmetic is
+    folded. A statement that calls a function is left unpropagated, since
+    the function may assign any variable, and every constant is forgotten
+    after it. Folds that would raise (1 / 0) are left to raise at run time.
+    """
+
+    def __init__(self, max_bits: int = 4096):
+        self.max_bits = max_bits
+        self.constants = {}
+        self.folds = []
+        self.propagated = 0
+
+    def optimize(self, statements) -> list[Expr]:
+        """Return the optimized statements."""
+        return [self.optimize_statement(statement) for statement in statements]
+
+    def optimize_statement(self, statement: Expr) -> Expr:
+        """Return the optimized statement, given the statements optimized before it."""
+        calls = _has_call(statement)
+        statement = self._fold(statement, {} if calls else self.constants)
+
+        if calls:
+            self.constants = {}
+        elif isinstance(statement, Assignment):
+            if isinstance(statement.value, Number):
+                self.constants[statement.name] = statement.value
+            else:
+                self.constants.pop(statement.name, None)
+        return statement
+
+    def _fold(self, expr: Expr, constants: dict) -> Expr:
+        """Return expr with its constant subtrees folded and the given constants substituted."""
+        if isinstance(expr, Variable):
+            constant = constants.get(expr.name)
+            if constant is None:
+                return expr
+            self.propagated += 1
+            return constant
+
+        if isinstance(expr, Binary):
+            left = self._fold(expr.left, constants)
+            right = self._fold(expr.right, constants)
+            operation = BINARY_OPERATIONS.get(expr.operator)
+            if (
+                operation is not None
+                and isinstance(left, Number)
+                and isinstance(right, Number)
+                and self._small_enough(expr.operator, left.value, right.value)
+            ):
+                folded = self._apply(expr, operation, left.value, right.value)
+                if folded is not None:
+                    return folded
+            if left is expr.left and right is expr.right:
+                return expr
+            return Binary(left, expr.operator, right)
+
+        if isinstance(expr, Unary):
+            operand = self._fold(expr.operand, constants)
+            operation = UNARY_OPERATIONS.get(expr.operator)
+            if operation is not None and isinstance(operand, Number):
+                folded = self._apply(expr, operation, operand.value)
+                if folded is not None:
+                    return folded
+            if operand is expr.operand:
+                return expr
+            return Unary(expr.operator, operand)
+
+        if isinstance(expr, Call):
+            arguments = [self._fold(argument, constants) for argument in expr.arguments]
+            if all(new is old for new, old in zip(arguments, expr.arguments)):
+                return expr
+            return Call(expr.callee, arguments)
+
+        if isinstance(expr, Assignment):
+            value = self._fold(expr.value, constants)
+            if value is expr.value:
+                return expr
+            return Assignment(expr.name, value)
+
+        if isinstance(expr, Definition):
+            body = self._fold(expr.body, {})
+            if body is expr.body:
+                return expr
+            return Definition(expr.name, expr.params, body)
+
+        return expr
+
+    def _apply(self, expr: Expr, operation, *operands) -> Number:
+        """Fold expr into the number operation gives, or return None if it raises."""
+        try:
+            value = operation(*operands)
+        except (ArithmeticError, ValueError):
+            return None
+        if type(value) is int and value.bit_length() > self.max_bits:
+            return None
+        self.folds.append((expr, value))
+        return Number(value)
+
+    def _small_enough(self, operator: TokenType, left, right) -> bool:
+        """Check that folding left operator right can't build an integer far past max_bits."""
+        if type(left) is not int or type(right) is not int:
+            return True
+        if operator == TokenType.EXPONENT:
+            # A negative power is a float; a positive one has about
+            # bit_length * right bits
+            return right <= 0 or left.bit_length() * right <= self.max_bits + right
+        if operator == TokenType.MULTIPLY:
+            return left.bit_length() + right.bit_length() <= self.max_bits + 1
+        return True
+
+
+def _has_call(expr: Expr) -> bool:
+    """Check whether evaluating expr calls a function."""
+    pending = [expr]
+    while pending:
+        node = pending.pop()
+        if isinstance(node, Call):
+            return True
+        if isinstance(node, Binary):
+            pending.append(node.left)
+            pending.append(node.right)
+        elif isinstance(node, Unary):
+            pending.append(node.operand)
+        elif isinstance(node, Assignment):
+            pending.append(node.value)
+    return False
@@ -0,0 +1,46 @@
+import hashlib
+
+from _tokenizer import Tokenizer
+from cache import LRUCache
+from parser import Parser
+
+
+class ParseCache:
+    """
+    Caches parsed programs under a hash of their source text, so a source
+    seen before skips the Tokenizer and Parser entirely.
+
+    cache: LRUCache - The parsed programs. Each one is charged the UTF-8
+        length of its source against max_bytes, and the cache's hits,
+        misses and evictions counters report how well it is doing.
+
+    Programs are returned as tuples shared between every caller that parses
+    the same source. The Interpreter never modifies the trees it evaluates,
+    so sharing them is safe.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        max_bytes: int = 64 * 1024 * 1024,
+        engine: str = "table",
+        parser_class: type = Parser,
+    ):
+        self.cache = LRUCache(max_entries, max_bytes)
+        self.engine = engine
+        self.parser_class = parser_class
+
+    def parse(self, source: str) -> tuple:
+        """Return the statements of source, parsing it only on a cache miss."""
+        data = source.encode("utf-8")
+        key = hashlib.blake2b(data, digest_size=16).digest()
+
+        statements = self.cache.get(key)
+        if statements is None:
+            tokens = Tokenizer(source, self.engine).scan_tokens(buffer=True)
+            statements = tuple(self.parser_class(tokens).parse())
+            self.cache.put(key, statements, len(data))
+        return statements
+
+    def __repr__(self):
+        return f"ParseCache({self.cache!r})"
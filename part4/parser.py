@@ -1,21 +1,44 @@
-from _token import Token, TokenType
+from _token import Token, TokenBuffer, TokenStream, TokenType
 from _tokenizer import Tokenizer
-from abstract_syntax_tree import Number, Binary, Assignment, Variable, Definition, Call
+from abstract_syntax_tree import Number, Binary, Assignment, Variable, Definition, Call, Interner
 
 
 class Parser:
-    def __init__(self, tokens: list):
+    def __init__(self, tokens: list | TokenBuffer, interner: Interner = None):
         self.tokens = tokens
         self.current = 0
+        self.interner = interner
+
+        if interner is not None:
+            # Build every node through the interner, so identical subtrees
+            # come out as one shared node
+            self._node = interner.intern
+
+        if isinstance(tokens, TokenBuffer):
+            # Read types, lexemes and values straight out of the buffer's
+            # arrays instead of building a Token view for every lookahead
+            self._type_at = tokens.type_at
+            self._lexeme_at = tokens.lexeme_at
+            self._value_at = tokens.value_at
 
     def parse(self):
         return self.program()
 
     def program(self):
-        statements = []
+        return list(self.statements())
+
+    def statements(self):
+        """Parse and yield one top-level statement at a time."""
         while not self._is_at_end():
-            statements.append(self.statement())
-        return statements
+            start = self.current
+            statement = self.statement()
+            if self.current == start:
+                # Nothing was consumed, so parsing again would loop forever
+                raise SyntaxError(f"Unexpected token: {self._lexeme_at(self.current)!r}")
+            if isinstance(self.tokens, TokenStream):
+                # Earlier statements are done with, keep only the lookbehind
+                self.tokens.release(self.current - 1)
+            yield statement
 
     def statement(self):
         """qq
@@ -24,11 +47,11 @@ class Parser:
         if self._match(TokenType.DEFINITION):
             return self.definition()
         if self._check(TokenType.IDENTIFIER) and self._check_next(TokenType.ASSIGN):
-            self._advance()
-            name = self._previous().lexeme
+            self.current += 1
+            name = self._lexeme_at(self.current - 1)
             self._consume(TokenType.ASSIGN, "Expect '=' after variable name.")
             value = self.expression()
-            return Assignment(name, value)
+            return self._node(Assignment(name, value))
 
         return self.expression()
 
@@ -38,13 +61,13 @@ class Parser:
         """
 
         self._consume(TokenType.IDENTIFIER, "Expect function name after 'def'.")
-        name = self._previous().lexeme
+        name = self._lexeme_at(self.current - 1)
         self._consume(TokenType.LEFT_PAREN, "Expect '(' after function name.")
 
         params = []
         while not self._check(TokenType.RIGHT_PAREN):
             if self._match(TokenType.IDENTIFIER):
-                params.append(self._previous().lexeme)
+                params.append(self._lexeme_at(self.current - 1))
             if not self._match(TokenType.COMMA):
                 break
 
@@ -54,7 +77,7 @@ class Parser:
         body = self.statement()
         self._consume(TokenType.RIGHT_BRACE, "Expect '}' after function body.")
 
-        return Definition(name, params, body)
+        return self._node(Definition(name, params, body))
 
     def expression(self):
         """
@@ -69,9 +92,9 @@ class Parser:
         expr = self.multiplication()
 
         while self._match(TokenType.PLUS, TokenType.MINUS):
-            operator = self._previous()
+            operator = self._type_at(self.current - 1)
             right = self.multiplication()
-            expr = Binary(expr, operator.type, right)
+            expr = self._node(Binary(expr, operator, right))
 
         return expr
 
@@ -82,9 +105,9 @@ class Parser:
         expr = self.exponent()
 
         while self._match(TokenType.MULTIPLY, TokenType.DIVIDE):
-            operator = self._previous()
+            operator = self._type_at(self.current - 1)
             right = self.exponent()
-            expr = Binary(expr, operator.type, right)
+            expr = self._node(Binary(expr, operator, right))
 
         return expr
 
@@ -95,9 +118,9 @@ class Parser:
         expr = self.unary()
 
         while self._match(TokenType.EXPONENT):
-            operator = self._previous()
+            operator = self._type_at(self.current - 1)
             right = self.exponent()
-            expr = Binary(expr, operator.type, right)
+            expr = self._node(Binary(expr, operator, right))
 
         return expr
 
@@ -106,15 +129,15 @@ class Parser:
         unary : ( '-' | '+' ) unary | factor
         """
         if self._match(TokenType.MINUS, TokenType.PLUS):
-            operator = self._previous()
+            operator = self._type_at(self.current - 1)
             right = self.unary()
             # Use a Unary node, or Binary with left as None if Unary not defined
             try:
                 from abstract_syntax_tree import Unary
 
-                return Unary(operator.type, right)
+                return self._node(Unary(operator, right))
             except ImportError:
-                return Binary(None, operator.type, right)
+                return self._node(Binary(None, operator, right))
         return self.factor()
 
     def factor(self):
@@ -122,13 +145,13 @@ class Parser:
         NUMBER | LEFT_PAREN expression RIGHT_PAREN | VARIABLE
         """
         if self._match(TokenType.NUMBER):
-            return Number(self._previous().value)
+            return self._node(Number(self._value_at(self.current - 1)))
         elif self._match(TokenType.LEFT_PAREN):
             expr = self.expression()
             self._consume(TokenType.RIGHT_PAREN, "Expect ')' after expression.")
             return expr
         elif self._match(TokenType.IDENTIFIER):
-            var = Variable(self._previous().lexeme)
+            var = self._node(Variable(self._lexeme_at(self.current - 1)))
             if self._check(TokenType.LEFT_PAREN):
                 args = []
                 self._consume(TokenType.LEFT_PAREN, "Expect '(' after variable name.")
@@ -137,9 +160,25 @@ class Parser:
                     while self._match(TokenType.COMMA):
                         args.append(self.expression())
                 self._consume(TokenType.RIGHT_PAREN, "Expect ')' after function call.")
-                return Call(var, args)
+                return self._node(Call(var, args))
             return var
 
+    def _node(self, node):
+        """Return a newly built node (or, when interning, its shared copy)."""
+        return node
+
+    def _type_at(self, index):
+        """Return the type of the token at the given index."""
+        return self.tokens[index].type
+
+    def _lexeme_at(self, index):
+        """Return the lexeme of the token at the given index."""
+        return self.tokens[index].lexeme
+
+    def _value_at(self, index):
+        """Return the literal value of the token at the given index."""
+        return self.tokens[index].value
+
     def _peek(self):
         """Return the current token."""
         return self.tokens[self.current]
@@ -160,7 +199,9 @@ class Parser:
         """Check if the current token matches any of the given token types."""
         for token_type in token_types:
             if self._check(token_type):
-                self._advance()
+                # _check() already ruled out EOF, so step past the token
+                # without materializing it the way _advance() does
+                self.current += 1
                 return True
         return False
 
@@ -170,24 +211,22 @@ class Parser:
 
     def _check(self, token_type):
         """Check if the current token is of the given type."""
-        if self._is_at_end():
-            return False
-        return self._peek().type == token_type
+        # Only the EOF token can sit at the end, so comparing types is enough
+        return token_type != TokenType.EOF and self._type_at(self.current) == token_type
 
     def _check_next(self, token_type):
         """Check if the next token is of the given type."""
-        next_token = self._peek_next()
-        if next_token is None:
+        if self._is_at_end():
             return False
-        return next_token.type == token_type
+        return self._type_at(self.current + 1) == token_type
 
     def _is_at_end(self):
         """Check if the current position is at the end of the token list."""
-        return self._peek().type == TokenType.EOF
+        return self._type_at(self.current) == TokenType.EOF
 
     def _consume(self, token_type, error_message):
         """Consume the current token if it matches the given type, otherwise raise an error."""
         if self._check(token_type):
-            self._advance()
-            return self._previous()
+            self.current += 1
+            return
         raise SyntaxError(error_message)
@@ -0,0 +1,58 @@
+from _token import TokenType
+from abstract_syntax_tree import Binary, Number, Unary
+from parser import Parser
+
+# How tightly each infix operator holds on to its operands
+BINDING_POWER = {
+    TokenType.PLUS: 10,
+    TokenType.MINUS: 10,
+    TokenType.MULTIPLY: 20,
+    TokenType.DIVIDE: 20,
+    TokenType.EXPONENT: 30,
+}
+RIGHT_ASSOCIATIVE = {TokenType.EXPONENT}
+
+# Prefix operators bind tighter than every infix operator, so "-2 ** 2" is
+# "(-2) ** 2", the same as Parser.unary() sitting below Parser.exponent()
+PREFIX_OPERATORS = {TokenType.MINUS, TokenType.PLUS}
+PREFIX_BINDING_POWER = 40
+
+
+class PrattParser(Parser):
+    """
+    A Parser that parses expressions by precedence climbing.
+
+    Instead of descending through addition, multiplication, exponent, unary
+    and factor for every operand, expression() looks operators up in
+    BINDING_POWER and makes one call per operand. The trees it builds are
+    the same ones Parser builds.
+    """
+
+    def expression(self, min_power=0):
+        """
+        expression : prefix ( INFIX expression )*
+
+        Keeps folding infix operators into the left operand for as long as
+        they bind tighter than min_power.
+        """
+        token_type = self._type_at(self.current)
+        if token_type == TokenType.NUMBER:
+            self.current += 1
+            expr = self._node(Number(self._value_at(self.current - 1)))
+        elif token_type in PREFIX_OPERATORS:
+            self.current += 1
+            expr = self._node(Unary(token_type, self.expression(PREFIX_BINDING_POWER)))
+        else:
+            expr = self.factor()
+
+        while True:
+            operator = self._type_at(self.current)
+            power = BINDING_POWER.get(operator)
+            if power is None or power <= min_power:
+                return expr
+            self.current += 1
+            if operator in RIGHT_ASSOCIATIVE:
+                right = self.expression(power - 1)
+            else:
+                right = self.expression(power)
+            expr = self._node(Binary(expr, operator, right))
@@ -0,0 +1,74 @@
+from _tokenizer import Tokenizer
+from abstract_syntax_tree import Definition
+from closure_compiler import ClosureCompiler
+from interpreter import Frame
+from parser import Parser
+from resolver import Resolver
+
+
+class PreparedStatement:
+    """
+    Source tokenized, parsed, checked and compiled once, to be run any
+    number of times with new values for its parameters.
+
+    interpreter: Interpreter - The session whose variables and functions
+        the statements read.
+    params: tuple - The names every run binds.
+    statements: list - The parsed statements.
+
+    The statements are checked with a Resolver when prepared, so reading a
+    variable that is neither a parameter nor a session variable is a
+    NameError at once, and compiled with a ClosureCompiler, whatever the
+    session's engine. Each run evaluates them in a Frame holding the
+    parameters in front of the session's variables, as a function call
+    would: an assignment only lasts until the run ends. Defs would change
+    the session, so they can't be prepared (though a call to a function
+    whose body is a def still defines it).
+
+    Functions and session variables are looked up when the statements
+    run, so a run sees the session as it is then. Like the Interpreter, a
+    prepared statement must not be run from two threads at once. Compiled
+    code can't keep to a Budget, so Interpreter.prepare() refuses a
+    budgeted session.
+    """
+
+    def __init__(self, interpreter, source: str, params=()):
+        self.interpreter = interpreter
+        self.params = tuple(params)
+        if len(set(self.params)) != len(self.params):
+            raise ValueError(f"Duplicate parameter in {self.params}.")
+
+        self.statements = Parser(Tokenizer(source).scan_tokens()).parse()
+        if not self.statements:
+            raise ValueError("Nothing to prepare.")
+        resolver = Resolver(set(interpreter.variables) | set(self.params), interpreter.functions)
+        for statement in self.statements:
+            if isinstance(statement, Definition):
+                raise ValueError(f"Can't prepare a def, since it would define {statement.name} for the session.")
+            resolver.check(statement)
+            resolver.record(statement)
+
+        compiler = ClosureCompiler(interpreter)
+        self._code = [compiler.compile(statement) for statement in self.statements]
+
+    def run(self, **bindings):
+        """Evaluate the statements with the parameters bound, and return the last one's value."""
+        if bindings.keys() != set(self.params):
+            missing = [param for param in self.params if param not in bindings]
+            if missing:
+                raise TypeError(f"Missing parameters: {', '.join(missing)}.")
+            unexpected = [name for name in bindings if name not in self.params]
+            raise TypeError(f"Unexpected parameters: {', '.join(unexpected)}.")
+
+        interpreter = self.interpreter
+        variables = interpreter.variables
+        interpreter.variables = Frame(variables, bindings)
+        try:
+            for code in self._code:
+                result = code()
+            return result
+        finally:
+            interpreter.variables = variables
+
+    def __repr__(self):
+        return f"PreparedStatement({self.statements}, params={list(self.params)})"
@@ -0,0 +1,188 @@
+from _token import TokenType
+from abstract_syntax_tree import Assignment, Binary, Call, Definition, Expr, Number, Unary, Variable
+from interpreter import Frame
+
+BINARY_SYMBOLS = {
+    TokenType.PLUS: "+",
+    TokenType.MINUS: "-",
+    TokenType.MULTIPLY: "*",
+    TokenType.DIVIDE: "/",
+    TokenType.EXPONENT: "**",
+}
+UNARY_SYMBOLS = {
+    TokenType.MINUS: "-",
+    TokenType.PLUS: "+",
+}
+
+# Integers longer than this are kept out of the source, since Python limits
+# how many digits it will convert between int and str
+_MAX_LITERAL_BITS = 1024
+
+
+class PythonBackend:
+    """
+    Translates statements into Python source, compiles it with compile()
+    and runs it in CPython's own evaluation loop.
+
+    interpreter: Interpreter - The interpreter whose state the code reads
+        and writes.
+    bodies: dict - The Definition and the Python function for the body of
+        every function defined so far, keyed by its name.
+
+    Every def becomes a Python function returning its body, and every
+    expression a native Python expression. Variables and functions are
+    still looked up when the code runs, through the interpreter, so calls
+    keep their dynamic scoping and their errors. A statement Python can't
+    compile (one nested too deeply, say) is run by the tree walker instead.
+    """
+
+    def __init__(self, interpreter):
+        self.interpreter = interpreter
+        self.bodies = {}
+        self._helpers = self._make_helpers()
+
+    def evaluate(self, expr: Expr) -> float:
+        """Compile expr to Python and run it."""
+        try:
+            code, namespace = self.compile(expr)
+        except (SyntaxError, RecursionError, MemoryError):
+            return self.interpreter._evaluate_tree(expr)
+        exec(code, namespace)
+        return namespace["__result"]
+
+    def compile(self, expr: Expr):
+        """Return the code object for expr and the namespace to run it in."""
+        source, consts = self.source(expr)
+        code = compile(source, "<mylang>", "exec")
+        return code, {**self._helpers, "__consts": consts}
+
+    def source(self, expr: Expr):
+        """
+        Return the Python source for expr, which leaves its value in
+        __result, and the constants the source refers to as __consts[i].
+        """
+        translator = _Translator()
+        result = translator.expression(expr)
+        lines = translator.functions + [f"__result = {result}"]
+        return "\n".join(lines) + "\n", translator.consts
+
+    def _make_helpers(self) -> dict:
+        """Return the functions the generated code calls, by their names in it."""
+        interpreter, bodies = self.interpreter, self.bodies
+
+        def lookup(name, count):
+            function = interpreter.functions.get(name)
+            if not function or len(function.params) != count:
+                # Raise the interpreter's own error
+                interpreter._lookup_function(Variable(name), count)
+            return function
+
+        def call(function, *arg_vals):
+            compiled = bodies.get(function.name)
+            if compiled is None or compiled[0] is not function:
+                # Defined without running its def through this backend
+                compiled = bodies[function.name] = (function, self._compile_body(function))
+
+            local_vars = interpreter.variables
+            interpreter.variables = Frame(local_vars, zip(function.params, arg_vals))
+            try:
+                return compiled[1]()
+            finally:
+                interpreter.variables = local_vars
+
+        def define(definition, body):
+            bodies[definition.name] = (definition, body)
+            interpreter.functions[definition.name] = definition
+
+        def assign(name, value):
+            interpreter.variables[name] = value
+            return value
+
+        def fail(message, *operands):
+            # The operands were evaluated first, as the tree walker does
+            raise RuntimeError(message)
+
+        return {
+            "__state": interpreter,
+            "__lookup": lookup,
+            "__call": call,
+            "__define": define,
+            "__assign": assign,
+            "__fail": fail,
+        }
+
+    def _compile_body(self, function: Definition):
+        """Return a Python function evaluating the body of a function defined elsewhere."""
+        try:
+            code, namespace = self.compile(function.body)
+        except (SyntaxError, RecursionError, MemoryError):
+            evaluate_tree = self.interpreter._evaluate_tree
+            return lambda: evaluate_tree(function.body)
+
+        def body():
+            exec(code, namespace)
+            return namespace["__result"]
+
+        return body
+
+
+class _Translator:
+    """
+    Builds the Python expression for a tree, collecting the functions for
+    the defs in it and the constants too large to write out.
+    """
+
+    def __init__(self):
+        self.functions = []
+        self.consts = []
+
+    def expression(self, expr: Expr) -> str:
+        if isinstance(expr, Number):
+            value = expr.value
+            if type(value) is int and value.bit_length() <= _MAX_LITERAL_BITS:
+                # Parenthesized, so a negative base isn't read as -(base ** y)
+                return f"({value!r})" if value < 0 else repr(value)
+            return self._const(value)
+
+        if isinstance(expr, Variable):
+            return f"__state.variables[{expr.name!r}]"
+
+        if isinstance(expr, Binary):
+            left, right = self.expression(expr.left), self.expression(expr.right)
+            symbol = BINARY_SYMBOLS.get(expr.operator)
+            if symbol is None:
+                return self._fail(expr, left, right)
+            return f"({left} {symbol} {right})"
+
+        if isinstance(expr, Unary):
+            operand = self.expression(expr.operand)
+            symbol = UNARY_SYMBOLS.get(expr.operator)
+            if symbol is None:
+                return self._fail(expr, operand)
+            return f"({symbol}{operand})"
+
+        if isinstance(expr, Assignment):
+            return f"__assign({expr.name!r}, {self.expression(expr.value)})"
+
+        if isinstance(expr, Definition):
+            body = self.expression(expr.body)
+            name = f"__body_{len(self.functions)}"
+            self.functions.append(f"def {name}():\n    return {body}")
+            return f"__define({self._const(expr)}, {name})"
+
+        if isinstance(expr, Call):
+            # Python evaluates the lookup before the arguments, so the
+            # function is checked first, as the tree walker does
+            arguments = "".join(f", {self.expression(argument)}" for argument in expr.arguments)
+            lookup = f"__lookup({expr.callee.name!r}, {len(expr.arguments)})"
+            return f"__call({lookup}{arguments})"
+
+        return self._fail(expr)
+
+    def _const(self, value) -> str:
+        self.consts.append(value)
+        return f"__consts[{len(self.consts) - 1}]"
+
+    def _fail(self, expr: Expr, *operands) -> str:
+        message = f"Unknown expression: {expr}"
+        return f"__fail({self._const(message)}{''.join(f', {operand}' for operand in operands)})"
@@ -0,0 +1,215 @@
+from abstract_syntax_tree import Assignment, Binary, Call, Definition, Expr, Unary, Variable
+from closure_compiler import ClosureCompiler
+
+
+class Resolver:
+    """
+    Checks, before statements run, that every variable they read will be
+    there, so a missing one is a NameError up front rather than a KeyError
+    in the middle of an evaluation.
+
+    names: set - The top-level variables assigned so far.
+    functions: dict - The functions defined so far, by name. A dict passed
+        in is shared rather than copied, so the resolver can follow the
+        functions of a live Interpreter.
+
+    Variables are dynamically scoped: a function body reads its parameters,
+    then the parameters of its callers, out to the top-level variables. So
+    a call f(...) needs every name f, or anything f calls, reads without a
+    parameter of the calling chain providing it, and only those have to be
+    top-level variables. Those names are worked out per function, following
+    calls to the functions defined at the time, and cached until the next
+    def. Calls to functions that aren't defined are left for the
+    interpreter to report.
+    """
+
+    def __init__(self, names=(), functions: dict = None):
+        self.names = set(names)
+        self.functions = {} if functions is None else functions
+        self._needs = {}  # function name -> names it needs from outside
+
+    def resolve(self, statements):
+        """Check, then record, each statement in turn."""
+        for statement in statements:
+            self.check(statement)
+            self.record(statement)
+
+    def check(self, statement: Expr):
+        """Raise a NameError if running statement would read a variable that isn't there."""
+        missing = sorted(self.needs(statement) - self.names)
+        if len(missing) == 1:
+            raise NameError(f"Variable {missing[0]} not defined.")
+        if missing:
+            raise NameError(f"Variables {', '.join(missing)} not defined.")
+
+    def needs(self, statement: Expr) -> set:
+        """Return the variables running statement reads, itself or through the functions it calls."""
+        reads, calls = names_used(statement)
+        for name in calls:
+            reads |= self._needs_of(name)
+        return reads
+
+    def record(self, statement: Expr):
+        """Note the variable or function statement creates, once it has run."""
+        if isinstance(statement, Assignment):
+            self.names.add(statement.name)
+        elif isinstance(statement, Definition):
+            self.define(statement)
+
+    def define(self, definition: Definition):
+        """Note a newly defined function, which may change what other functions need."""
+        self.functions[definition.name] = definition
+        self._needs.clear()
+
+    def _needs_of(self, name: str) -> frozenset:
+        """Return the names a call to the function needs from outside it."""
+        needs = self._needs.get(name)
+        if needs is not None:
+            return needs
+        if name not in self.functions:
+            return frozenset()
+
+        # Gather the functions the call can reach, and what each of their
+        # bodies reads and calls directly
+        uses = {}
+        pending = [name]
+        while pending:
+            function = self.functions[pending.pop()]
+            reads, calls = names_used(function.body)
+            calls = [callee for callee in calls if callee in self.functions]
+            uses[function.name] = (reads - set(function.params), calls, set(function.params))
+            pending.extend(callee for callee in calls if callee not in uses)
+
+        # A function needs what its body reads and what its callees need,
+        # minus its own parameters. Calls can be recursive, so iterate until
+        # nothing changes
+        needs = {function: set(reads) for function, (reads, _, _) in uses.items()}
+        changed = True
+        while changed:
+            changed = False
+            for function, (_, calls, params) in uses.items():
+                for callee in calls:
+                    new = needs[callee] - params - needs[function]
+                    if new:
+                        needs[function] |= new
+                        changed = True
+
+        for function, function_needs in needs.items():
+            self._needs[function] = frozenset(function_needs)
+        return self._needs[name]
+
+
+def names_used(expr: Expr):
+    """Return the names expr reads and the functions it calls, leaving out the bodies of defs."""
+    reads, calls = set(), []
+    pending = [expr]
+    while pending:
+        node = pending.pop()
+        if isinstance(node, Variable):
+            reads.add(node.name)
+        elif isinstance(node, Binary):
+            pending.append(node.left)
+            pending.append(node.right)
+        elif isinstance(node, Unary):
+            pending.append(node.operand)
+        elif isinstance(node, Call):
+            calls.append(node.callee.name)
+            pending.extend(node.arguments)
+        elif isinstance(node, Assignment):
+            pending.append(node.value)
+    return reads, calls
+
+
+class SlotCompiler(ClosureCompiler):
+    """
+    A ClosureCompiler whose function calls keep their arguments in a list,
+    with each parameter read compiled to a fixed index into it.
+
+    frames: list - (slots, values) for every call in progress, innermost
+        last: the called function's parameter slots by name, and the
+        argument values in them.
+
+    Top-level variables stay in the interpreter's variables. A body reads
+    its own parameters by index, and any other name from the innermost
+    caller with a parameter of that name, or else from the top-level
+    variables, which is what the interpreter's Frame chain does too. An
+    assignment in a body only gives the body its value: the variable would
+    vanish with the call before anything could read it.
+    """
+
+    def __init__(self, interpreter):
+        super().__init__(interpreter)
+        self.frames = []
+        self._slots = None  # The parameter slots of the body being compiled
+
+    def compile(self, expr: Expr):
+        if isinstance(expr, Variable):
+            return self._compile_variable(expr.name)
+        if isinstance(expr, Assignment) and self._slots is not None:
+            return self.compile(expr.value)
+        return super().compile(expr)
+
+    def compile_body(self, definition: Definition):
+        """Return the compiled body of a function and its parameter slots."""
+        outer = self._slots
+        self._slots = slots = {param: slot for slot, param in enumerate(definition.params)}
+        try:
+            return self.compile(definition.body), slots
+        finally:
+            self._slots = outer
+
+    def _compile_variable(self, name: str):
+        variables, frames = self.interpreter.variables, self.frames
+        if self._slots is None:
+            return lambda: variables[name]
+
+        slot = self._slots.get(name)
+        if slot is not None:
+            return lambda: frames[-1][1][slot]
+
+        def read():
+            for slots, values in reversed(frames):
+                slot = slots.get(name)
+                if slot is not None:
+                    return values[slot]
+            return variables[name]
+
+        return read
+
+    def _compile_definition(self, expr: Definition):
+        interpreter, bodies = self.interpreter, self.bodies
+        body, slots = self.compile_body(expr)
+
+        def define():
+            bodies[expr.name] = (expr, body, slots)
+            interpreter.functions[expr.name] = expr
+            interpreter.resolver.define(expr)
+            return None
+
+        return define
+
+    def _compile_call(self, expr: Call):
+        interpreter, bodies, frames = self.interpreter, self.bodies, self.frames
+        callee, count = expr.callee, len(expr.arguments)
+        name = callee.name
+        arguments = [self.compile(argument) for argument in expr.arguments]
+
+        def call():
+            function = interpreter.functions.get(name)
+            if not function or len(function.params) != count:
+                # Raise the interpreter's own error
+                interpreter._lookup_function(callee, count)
+            arg_vals = [argument() for argument in arguments]
+
+            compiled = bodies.get(name)
+            if compiled is None or compiled[0] is not function:
+                # Defined without running its def through this compiler
+                compiled = bodies[name] = (function, *self.compile_body(function))
+
+            frames.append((compiled[2], arg_vals))
+            try:
+                return compiled[1]()
+            finally:
+                frames.pop()
+
+        return call
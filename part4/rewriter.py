@@ -0,0 +1,173 @@
+import math
+
+from _token import TokenType
+from abstract_syntax_tree import Assignment, Binary, Call, Definition, Expr, Interner, Number, Unary, Variable
+
+# What a subexpression is proven to evaluate to
+_INT = "int"
+_NOT_INT = "not int"  # A float (or a complex, from a fractional power)
+
+
+class Rewriter:
+    """
+    Rewrites expressions into cheaper ones that give the same results:
+    common-subexpression elimination and strength reduction.
+
+    integers: bool - Promise that every variable holds an int, which
+        enables the rewrites that are only exact for ints.
+    counts: dict - How many times each rewrite was applied, by name.
+
+    Every statement (function bodies included) is rebuilt through its own
+    Interner, so repeated subexpressions in it become a single shared node.
+    Interpreter(reuse_shared=True) then evaluates each of them once.
+
+    These rewrites apply where the operand is proven to be a number, int
+    or not: --x and +x to x, x * 1 and 1 * x to x, x - 0 to x, and x ** 1
+    to x. Anything else, such as the None a call to a function whose body
+    is a def returns, would raise a TypeError there. These only apply
+    where the operand is proven to be an int: x + 0 to x, and x ** 2 to
+    x * x when x is a plain variable (it would otherwise be evaluated
+    twice). Dividing a proven non-int by a power of two becomes a
+    multiplication by its inverse: for an int the two differ once it is
+    too large for a float.
+
+    The results are the same, down to the sign of zero, for int and float
+    values. Complex values (from fractional powers of negative numbers)
+    still compare equal, unless one of their parts is infinite.
+    """
+
+    def __init__(self, integers: bool = False):
+        self.integers = integers
+        self.counts = {}
+
+    def rewrite(self, statements) -> list[Expr]:
+        """Return the rewritten statements."""
+        return [self.rewrite_statement(statement) for statement in statements]
+
+    def rewrite_statement(self, statement: Expr) -> Expr:
+        """Return the rewritten statement."""
+        self._node = Interner().intern
+        return self._rewrite(statement)[0]
+
+    def _count(self, name: str):
+        self.counts[name] = self.counts.get(name, 0) + 1
+
+    def _rewrite(self, expr: Expr):
+        """Return the rewritten expr and what it is proven to evaluate to, if anything."""
+        node = self._node
+
+        if isinstance(expr, Number):
+            if type(expr.value) is int:
+                return node(expr), _INT
+            return node(expr), _NOT_INT if type(expr.value) is float else None
+
+        if isinstance(expr, Variable):
+            return node(expr), _INT if self.integers else None
+
+        if isinstance(expr, Binary):
+            return self._rewrite_binary(expr)
+
+        if isinstance(expr, Unary):
+            operand, kind = self._rewrite(expr.operand)
+            if operand is not None and kind is not None:
+                if expr.operator == TokenType.PLUS:
+                    self._count("+x")
+                    return operand, kind
+                if (
+                    expr.operator == TokenType.MINUS
+                    and isinstance(operand, Unary)
+                    and operand.operator == TokenType.MINUS
+                ):
+                    self._count("--x")
+                    # -x is an int exactly when x is
+                    return operand.operand, kind
+            return node(Unary(expr.operator, operand)), kind if expr.operator == TokenType.MINUS else None
+
+        if isinstance(expr, Call):
+            arguments = [self._rewrite(argument)[0] for argument in expr.arguments]
+            return node(Call(node(expr.callee), arguments)), None
+
+        if isinstance(expr, Assignment):
+            return node(Assignment(expr.name, self._rewrite(expr.value)[0])), None
+
+        if isinstance(expr, Definition):
+            return node(Definition(expr.name, expr.params, self._rewrite(expr.body)[0])), None
+
+        return expr, None
+
+    def _rewrite_binary(self, expr: Binary):
+        left, left_kind = self._rewrite(expr.left)
+        right, right_kind = self._rewrite(expr.right)
+        operator = expr.operator
+
+        if left is not None and right is not None:
+            if operator == TokenType.MULTIPLY:
+                if _is_int(right, 1) and left_kind is not None:
+                    self._count("x * 1")
+                    return left, left_kind
+                if _is_int(left, 1) and right_kind is not None:
+                    self._count("x * 1")
+                    return right, right_kind
+            elif operator == TokenType.MINUS:
+                if _is_int(right, 0) and left_kind is not None:
+                    self._count("x - 0")
+                    return left, left_kind
+            elif operator == TokenType.PLUS:
+                if _is_int(right, 0) and left_kind == _INT:
+                    self._count("x + 0")
+                    return left, left_kind
+                if _is_int(left, 0) and right_kind == _INT:
+                    self._count("x + 0")
+                    return right, right_kind
+            elif operator == TokenType.EXPONENT:
+                if _is_int(right, 1) and left_kind is not None:
+                    self._count("x ** 1")
+                    return left, left_kind
+                if _is_int(right, 2) and left_kind == _INT and isinstance(left, Variable):
+                    self._count("x ** 2")
+                    return self._node(Binary(left, TokenType.MULTIPLY, left)), _INT
+            elif operator == TokenType.DIVIDE:
+                inverse = _power_of_two_inverse(right)
+                if inverse is not None and left_kind == _NOT_INT:
+                    self._count("x / 2**k")
+                    return self._node(Binary(left, TokenType.MULTIPLY, self._node(Number(inverse)))), _NOT_INT
+
+        node = self._node(Binary(left, operator, right))
+        if operator == TokenType.DIVIDE:
+            # True division never gives an int
+            return node, _NOT_INT
+        if operator in (TokenType.PLUS, TokenType.MINUS, TokenType.MULTIPLY):
+            if left_kind == _INT and right_kind == _INT:
+                return node, _INT
+            if _NOT_INT in (left_kind, right_kind) and None not in (left, right):
+                return node, _NOT_INT
+        if operator == TokenType.EXPONENT and left_kind == _INT and _is_natural(right):
+            return node, _INT
+        return node, None
+
+
+def _is_int(expr: Expr, value: int) -> bool:
+    """Check whether expr is the int literal value (and not, say, 1.0)."""
+    return isinstance(expr, Number) and type(expr.value) is int and expr.value == value
+
+
+def _is_natural(expr: Expr) -> bool:
+    """Check whether expr is a non-negative int literal."""
+    return isinstance(expr, Number) and type(expr.value) is int and expr.value >= 0
+
+
+def _power_of_two_inverse(expr: Expr):
+    """Return the exact float inverse of expr if it is a power-of-two literal, else None."""
+    if not isinstance(expr, Number) or type(expr.value) not in (int, float) or not expr.value:
+        return None
+    try:
+        value = float(expr.value)
+    except OverflowError:
+        return None
+    if not math.isfinite(value) or abs(math.frexp(value)[0]) != 0.5:
+        return None
+    inverse = 1 / value
+    if not math.isfinite(inverse) or abs(math.frexp(inverse)[0]) != 0.5:
+        # The inverse lost precision as a subnormal
+        return None
+    return inverse
@@ -0,0 +1,73 @@
+import sys
+
+from _token import Token, TokenStream, TokenType
+from _tokenizer import Tokenizer
+from inliner import Inliner
+from interpreter import Interpreter
+from optimizer import Optimizer
+from parser import Parser
+
+
+def tokenize_lines(lines, engine: str = "table"):
+    """
+    Yield the tokens of a script line by line, followed by a single EOF token.
+
+    No token can contain whitespace, so tokenizing each line on its own gives
+    the same tokens as tokenizing the whole script at once.
+    """
+    for line in lines:
+        tokens = Tokenizer(line, engine).scan_tokens()
+        tokens.pop()  # Drop the line's own EOF token
+        yield from tokens
+    yield Token(TokenType.EOF, "", None)
+
+
+def run(
+    lines,
+    interpreter: Interpreter = None,
+    engine: str = "table",
+    optimizer: Optimizer = None,
+    inliner: Inliner = None,
+):
+    """
+    Tokenize, parse and evaluate a script one statement at a time, yielding
+    each statement's result as soon as it has been evaluated. An inliner,
+    then an optimizer, if given, rewrite each statement before it is
+    evaluated. The defs an inliner emits again are evaluated right after
+    their statement, without yielding a result.
+
+    Only the current line's tokens and the current statement's tree are held
+    in memory, however long the script is.
+    """
+    if interpreter is None:
+        interpreter = Interpreter()
+    parser = Parser(TokenStream(tokenize_lines(lines, engine)))
+    for statement in parser.statements():
+        statements = [statement] if inliner is None else inliner.inline_statement(statement)
+        if optimizer is not None:
+            statements = optimizer.optimize(statements)
+        result = interpreter.evaluate(statements[0])
+        for statement in statements[1:]:
+            interpreter.evaluate(statement)
+        yield result
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    optimizer = inliner = None
+    while args[:1] in (["-O"], ["-I"]):
+        if args[0] == "-O":
+            optimizer = Optimizer()
+        else:
+            inliner = Inliner()
+        args = args[1:]
+    if len(args) != 1:
+        sys.exit("usage: python runner.py [-O] [-I] SCRIPT")
+    with open(args[0]) as script:
+        for result in run(script, optimizer=optimizer, inliner=inliner):
+            if result is not None:
+                print(result)
+    if optimizer is not None:
+        print(f"folded {len(optimizer.folds)}, propagated {optimizer.propagated}", file=sys.stderr)
+    if inliner is not None:
+        print(f"inlined {inliner.inlined}, reinlined {inliner.reinlined}", file=sys.stderr)
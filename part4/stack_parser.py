@@ -0,0 +1,109 @@
+from _token import TokenType
+from abstract_syntax_tree import Binary, Call, Number, Unary, Variable
+from parser import Parser
+from pratt_parser import BINDING_POWER, PREFIX_BINDING_POWER, PREFIX_OPERATORS, RIGHT_ASSOCIATIVE
+
+# Kinds of entries on StackParser's operator stack. Groups sort below
+# operators so a single comparison tells them apart.
+_PAREN = 0
+_CALL = 1
+_BINARY = 2
+_UNARY = 3
+
+
+class StackParser(Parser):
+    """
+    A Parser that parses expressions with explicit operand and operator
+    stacks instead of recursive calls.
+
+    Nesting depth is limited only by memory, so machine-generated input such
+    as "((((...1...))))" or long "a ** b ** ..." chains never hits Python's
+    recursion limit. The trees it builds are the same ones Parser builds.
+    Statements (and so nested function definitions) are still parsed
+    recursively.
+    """
+
+    def expression(self):
+        """
+        Parse an expression in one loop, shunting operators onto a stack
+        until an operator of lower binding power (or the end of a group)
+        shows they can be folded into Binary and Unary nodes.
+        """
+        operands = []
+        # (kind, operator or callee, binding power or first argument index)
+        operators = []
+        expect_operand = True
+
+        while True:
+            token_type = self._type_at(self.current)
+
+            if expect_operand:
+                expect_operand = False
+                if token_type == TokenType.NUMBER:
+                    self.current += 1
+                    operands.append(self._node(Number(self._value_at(self.current - 1))))
+                elif token_type in PREFIX_OPERATORS:
+                    self.current += 1
+                    operators.append((_UNARY, token_type, PREFIX_BINDING_POWER))
+                    expect_operand = True
+                elif token_type == TokenType.LEFT_PAREN:
+                    self.current += 1
+                    operators.append((_PAREN, None, None))
+                    expect_operand = True
+                elif token_type == TokenType.IDENTIFIER:
+                    self.current += 1
+                    var = self._node(Variable(self._lexeme_at(self.current - 1)))
+                    if not self._match(TokenType.LEFT_PAREN):
+                        operands.append(var)
+                    elif self._match(TokenType.RIGHT_PAREN):
+                        operands.append(self._node(Call(var, [])))
+                    else:
+                        # Arguments pile up on the operand stack from here on
+                        operators.append((_CALL, var, len(operands)))
+                        expect_operand = True
+                else:
+                    # Parser.factor() returns None when there is no operand
+                    operands.append(None)
+                continue
+
+            power = BINDING_POWER.get(token_type)
+            if power is not None:
+                # Fold every pending operator that binds at least as tightly
+                # (strictly tighter for right-associative operators)
+                if token_type in RIGHT_ASSOCIATIVE:
+                    power += 1
+                while operators and operators[-1][0] >= _BINARY and operators[-1][2] >= power:
+                    _reduce(operands, operators.pop(), self._node)
+                self.current += 1
+                operators.append((_BINARY, token_type, BINDING_POWER[token_type]))
+                expect_operand = True
+                continue
+
+            # Any other token closes the innermost group or ends the expression
+            while operators and operators[-1][0] >= _BINARY:
+                _reduce(operands, operators.pop(), self._node)
+            if not operators:
+                return operands.pop()
+
+            kind, callee, first_argument = operators[-1]
+            if kind == _PAREN:
+                self._consume(TokenType.RIGHT_PAREN, "Expect ')' after expression.")
+                operators.pop()
+            elif self._match(TokenType.COMMA):
+                expect_operand = True
+            else:
+                self._consume(TokenType.RIGHT_PAREN, "Expect ')' after function call.")
+                operators.pop()
+                arguments = operands[first_argument:]
+                del operands[first_argument:]
+                operands.append(self._node(Call(callee, arguments)))
+
+
+def _reduce(operands, entry, node):
+    """Fold an operator popped off the operator stack into its operands."""
+    kind, operator, _ = entry
+    if kind == _UNARY:
+        operands.append(node(Unary(operator, operands.pop())))
+    else:
+        right = operands.pop()
+        operands[-1] = node(Binary(operands[-1], operator, right))
@@ -0,0 +1,68 @@
+import pickle
+import unittest
+from _token import TokenType
+from _tokenizer import Tokenizer
+from abstract_syntax_tree import Binary, Call, Definition, Interner, Number, Variable
+from parser import Parser
+from pratt_parser import PrattParser
+from stack_parser import StackParser
+
+
+def parse(source):
+    return Parser(Tokenizer(source).scan_tokens()).parse()
+
+
+class TestAbstractSyntaxTree(unittest.TestCase):
+    def test_structural_equality_and_hash(self):
+        first = parse("def f(a, b) = { a * (b + 1) } f(2, x ** 3)")
+        second = parse("def f(a, b) = { a * (b + 1) } f(2, x ** 3)")
+        self.assertEqual(first, second)
+        self.assertEqual([hash(s) for s in first], [hash(s) for s in second])
+        self.assertEqual(len({*first, *second}), 2)
+
+        self.assertNotEqual(parse("1 + 2"), parse("1 - 2"))
+        self.assertNotEqual(parse("def f(a) = { a }"), parse("def f(b) = { b }"))
+        self.assertNotEqual(Number(1), Number(1.0))
+        self.assertNotEqual(Number(0.0), Number(-0.0))
+        self.assertEqual(len({Number(0.0), Number(-0.0), Number(0), Number(0.0)}), 3)
+        self.assertNotEqual(Call(Variable("f"), [Number(1)]), Call(Variable("f"), []))
+
+    def test_nodes_are_immutable(self):
+        node = Binary(Number(1), TokenType.PLUS, Number(2))
+        with self.assertRaises(AttributeError):
+            node.left = Number(3)
+        with self.assertRaises(AttributeError):
+            node.extra = 1
+        self.assertIsInstance(Definition("f", ["a"], Variable("a")).params, tuple)
+
+    def test_deep_trees(self):
+        def chain(depth):
+            expr = Number(1)
+            for _ in range(depth):
+                expr = Binary(Number(2), TokenType.EXPONENT, expr)
+            return expr
+
+        self.assertEqual(chain(50000), chain(50000))
+        self.assertNotEqual(chain(50000), chain(50001))
+
+    def test_pickle(self):
+        statements = parse("def f(a) = { -a } x = f(1) / 2")
+        self.assertEqual(pickle.loads(pickle.dumps(statements)), statements)
+
+    def test_interner_shares_equal_subtrees(self):
+        interner = Interner()
+        for parser_class in (Parser, PrattParser, StackParser):
+            [expr] = parser_class(Tokenizer("(x + 1) * (x + 1)").scan_tokens(), interner).parse()
+            self.assertIs(expr.left, expr.right)
+            self.assertEqual(expr, parse("(x + 1) * (x + 1)")[0])
+        # Every parser handed back the same nodes: x, 1, x + 1 and the product
+        self.assertEqual(len(interner), 4)
+
+        # 0.0 and -0.0 are equal numbers, but not the same node
+        zero, negative_zero = interner.intern(Number(0.0)), interner.intern(Number(-0.0))
+        self.assertIsNot(zero, negative_zero)
+        self.assertEqual(str(negative_zero.value), "-0.0")
+
+
+if __name__ == "__main__":
+    unittest.main()
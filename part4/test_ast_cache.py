@@ -0,0 +1,80 @@
+import os
+import tempfile
+import unittest
+from _token import TokenType
+from _tokenizer import Tokenizer
+from abstract_syntax_tree import Binary, Number
+from ast_cache import _HEADER, cache_path, decode, encode, load
+from parser import Parser
+
+
+def parse(source):
+    return Parser(Tokenizer(source).scan_tokens()).parse()
+
+
+class FailingParser(Parser):
+    def parse(self):
+        raise AssertionError("The script should have come from the cache.")
+
+
+class TestAstCache(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "script.ml")
+
+    def write(self, source, mtime_ns=None):
+        with open(self.path, "w") as script:
+            script.write(source)
+        if mtime_ns is not None:
+            os.utime(self.path, ns=(mtime_ns, mtime_ns))
+
+    def test_round_trip(self):
+        statements = parse("def f(a, b) = { -a * (b + 1) } x = f(2, y ** 3) / 4 g() 1 +")
+        self.assertEqual(decode(encode(statements)), statements)
+
+        deep = Number(1)
+        for _ in range(50000):
+            deep = Binary(Number(2), TokenType.EXPONENT, deep)
+        self.assertEqual(decode(encode([deep, Number(1.0)])), [deep, Number(1.0)])
+
+        signed = [Number(0.0), Number(-0.0), Number(0)]
+        self.assertEqual([str(n.value) for n in decode(encode(signed))], ["0.0", "-0.0", "0"])
+
+    def test_load_reuses_cache_file(self):
+        self.write("def f(a) = { a * 2 } f(21)", mtime_ns=10**18)
+        statements = load(self.path)
+        self.assertEqual(statements, parse("def f(a) = { a * 2 } f(21)"))
+        self.assertTrue(os.path.exists(cache_path(self.path)))
+        self.assertEqual(load(self.path, parser_class=FailingParser), statements)
+
+        # Touching the script keeps the cache, since its hash still matches
+        self.write("def f(a) = { a * 2 } f(21)", mtime_ns=2 * 10**18)
+        self.assertEqual(load(self.path, parser_class=FailingParser), statements)
+        # ...and records the new time, so the next load needn't hash it
+        with open(cache_path(self.path), "rb") as cache_file:
+            self.assertEqual(_HEADER.unpack_from(cache_file.read())[3], 2 * 10**18)
+
+    def test_load_reparses_corrupt_cache_file(self):
+        self.write("def f(a) = { a * 2 } f(21)", mtime_ns=10**18)
+        statements = load(self.path)
+        with open(cache_path(self.path), "rb") as cache_file:
+            data = cache_file.read()
+        for corrupt in [data[: len(data) - 5], data[: _HEADER.size] + b"\xff" * 40]:
+            with open(cache_path(self.path), "wb") as cache_file:
+                cache_file.write(corrupt)
+            self.assertEqual(load(self.path), statements)
+            # The cache file was rewritten
+            self.assertEqual(load(self.path, parser_class=FailingParser), statements)
+
+    def test_load_reparses_changed_source(self):
+        self.write("x = 1", mtime_ns=10**18)
+        load(self.path)
+        self.write("x = 2", mtime_ns=2 * 10**18)
+        self.assertEqual(load(self.path), parse("x = 2"))
+        self.write("x = 30", mtime_ns=2 * 10**18)
+        self.assertEqual(load(self.path), parse("x = 30"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import csv
+import io
+import json
+import os
+import tempfile
+import unittest
+from batch import Scorer, main, read_rows, score_rows, write_rows
+
+SCRIPT = "rate = 3\ndef price(units, extra) = { units * rate + extra }\n"
+
+
+class TestBatch(unittest.TestCase):
+    def test_scores_rows(self):
+        scorer = Scorer("price(n, 1) / 2", SCRIPT.splitlines(True))
+        self.assertEqual(scorer.needs, {"n", "rate"})
+        self.assertEqual(scorer.score({"n": "3", "id": "a"}), 5.0)
+        self.assertEqual(scorer.score({"n": 2.5, "rate": "2"}), 3.0)
+        self.assertEqual(scorer.interpreter.variables, {"rate": 3})
+
+    def test_workers_keep_the_order(self):
+        rows = ({"n": n} for n in range(100))
+        pairs = list(score_rows("price(n, n) - n * rate", rows, SCRIPT, workers=2, chunk_size=7))
+        self.assertEqual(pairs, [({"n": n}, n) for n in range(100)])
+
+    def test_errors_name_the_row(self):
+        with self.assertRaises(ValueError) as context:
+            list(score_rows("n + 1", [{"n": "1"}, {"n": "x"}], chunk_size=1))
+        self.assertEqual(context.exception.__notes__, ["In row 2 of the input."])
+
+    def test_rows_must_fit(self):
+        with self.assertRaisesRegex(ValueError, "Line 3 of the input is not a JSON object"):
+            list(read_rows(io.StringIO('{"n": 1}\n\n[1, 2]\n'), "jsonl"))
+
+        output = io.StringIO()
+        pairs = [({"n": 1, "m": 2}, 3), ({"n": 4}, 4), ({"n": 5, "extra": 6}, 5)]
+        with self.assertRaisesRegex(ValueError, "Row 3 has columns the CSV header doesn't: extra"):
+            write_rows(output, "csv", pairs)
+        self.assertEqual(output.getvalue().splitlines(), ["n,m,result", "1,2,3", "4,,4"])
+
+    def test_command_line(self):
+        with tempfile.TemporaryDirectory() as directory:
+            paths = {name: os.path.join(directory, name) for name in ("script", "in.csv", "out.jsonl", "out.csv")}
+            with open(paths["script"], "w") as file:
+                file.write(SCRIPT)
+            with open(paths["in.csv"], "w", newline="") as file:
+                file.write("id,n,bonus\na,1,10\nb,4,0\n")
+
+            main(["-s", paths["script"], "price(n, bonus)", paths["in.csv"], paths["out.jsonl"]])
+            with open(paths["out.jsonl"]) as file:
+                rows = [json.loads(line) for line in file]
+            self.assertEqual(
+                rows,
+                [
+                    {"id": "a", "n": "1", "bonus": "10", "result": 13},
+                    {"id": "b", "n": "4", "bonus": "0", "result": 12},
+                ],
+            )
+
+            main(["-w", "2", "-c", "1", "--column", "twice", "n * 2", paths["out.jsonl"], paths["out.csv"]])
+            with open(paths["out.csv"], newline="") as file:
+                self.assertEqual([row["twice"] for row in csv.DictReader(file)], ["2", "8"])
+
+
+if __name__ == "__main__":
+    unittest.main()
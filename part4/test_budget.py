@@ -0,0 +1,83 @@
+import time
+import unittest
+from _tokenizer import Tokenizer
+from budget import Budget, BudgetExceededError, CallLimitError, DeadlineError, NodeLimitError, SizeLimitError
+from interpreter import Interpreter
+from parser import Parser
+
+
+def parse(source):
+    return Parser(Tokenizer(source).scan_tokens()).parse()
+
+
+def evaluate(interpreter, source):
+    result = None
+    for statement in parse(source):
+        result = interpreter.evaluate(statement)
+    return result
+
+
+class TestBudget(unittest.TestCase):
+    def test_caps_integer_sizes_before_computing(self):
+        for engine in ("tree", "stack"):
+            interpreter = Interpreter(engine, budget=Budget(max_bits=1000))
+            start = time.monotonic()
+            with self.assertRaises(SizeLimitError):
+                evaluate(interpreter, "9 ** 9 ** 9")
+            with self.assertRaises(SizeLimitError):
+                evaluate(interpreter, "2 ** 1000")
+            with self.assertRaises(SizeLimitError):
+                evaluate(interpreter, "x = 2 ** 600 x * x")
+            self.assertLess(time.monotonic() - start, 1)
+            self.assertEqual(evaluate(interpreter, "2 ** 999 + (-3) ** 3 + 2 ** -1 + 1 ** (10 ** 9)"), 2**999 - 25.5)
+
+    def test_limits_nodes_and_calls(self):
+        source = "def f(a) = { a * a + 1 } f(f(2))"
+        for engine in ("tree", "stack"):
+            budget = Budget(max_nodes=13, max_calls=2)
+            interpreter = Interpreter(engine, budget=budget)
+            self.assertEqual(evaluate(interpreter, source), 26)
+            self.assertEqual((budget.nodes, budget.calls), (13, 2))
+
+            interpreter = Interpreter(engine, budget=Budget(max_nodes=12))
+            with self.assertRaises(NodeLimitError):
+                evaluate(interpreter, source)
+            interpreter = Interpreter(engine, budget=Budget(max_calls=1))
+            with self.assertRaises(CallLimitError):
+                evaluate(interpreter, source)
+            # Each evaluation gets the whole budget, and the variables survive
+            evaluate(interpreter, "x = 1 f(x)")
+            self.assertEqual(interpreter.variables, {"x": 1})
+            with self.assertRaises(ZeroDivisionError):
+                evaluate(interpreter, "def g(a) = { a / 0 } g(1)")
+            evaluate(interpreter, "y = 3")
+            self.assertEqual(interpreter.variables, {"x": 1, "y": 3})
+
+    def test_deadline(self):
+        # Without conditionals recursion never ends, so make the work wide instead
+        source = (
+            "def f(a) = { a + a + a + a } def g(a) = { f(a) + f(a) + f(a) } def h(a) = { g(a) + g(a) + g(a) } "
+            + " + ".join(["h(1)"] * 300)
+        )
+        interpreter = Interpreter(budget=Budget(timeout=0.005))
+        with self.assertRaises(DeadlineError):
+            evaluate(interpreter, source)
+        self.assertTrue(issubclass(DeadlineError, BudgetExceededError))
+        self.assertTrue(issubclass(BudgetExceededError, RuntimeError))
+
+    def test_needs_the_tree_or_stack_engine(self):
+        with self.assertRaises(ValueError):
+            Interpreter("closure", budget=Budget())
+        with self.assertRaises(ValueError):
+            Interpreter(reuse_shared=True, budget=Budget())
+
+    def test_compiled_paths_refuse_a_budget(self):
+        interpreter = Interpreter(budget=Budget(max_bits=64))
+        with self.assertRaises(ValueError):
+            interpreter.prepare("x ** x ** x", ["x"])
+        with self.assertRaises(ValueError):
+            interpreter.evaluate_batch("x ** x ** x", x=[5])
+
+
+if __name__ == "__main__":
+    unittest.main()
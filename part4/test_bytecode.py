@@ -0,0 +1,57 @@
+import pickle
+import unittest
+from _tokenizer import Tokenizer
+from abstract_syntax_tree import Call, Number, Variable
+from bytecode import Compiler, disassemble
+from interpreter import Interpreter
+from parser import Parser
+
+
+def parse(source):
+    return Parser(Tokenizer(source).scan_tokens()).parse()
+
+
+class TestBytecode(unittest.TestCase):
+    def test_disassemble(self):
+        [statement] = parse("def f(a, b) = { x = -a * (b + 2) }")
+        self.assertEqual(
+            disassemble(Compiler.compile(statement)),
+            "\n".join(
+                [
+                    "   0 DEF           0 (f)",
+                    "   1 RETURN",
+                    "",
+                    "f(a, b):",
+                    "   0 LOAD_VAR      0 (a)",
+                    "   1 NEG",
+                    "   2 LOAD_VAR      1 (b)",
+                    "   3 LOAD_CONST    0 (2)",
+                    "   4 BINARY_ADD",
+                    "   5 BINARY_MUL",
+                    "   6 STORE_VAR     2 (x)",
+                    "   7 RETURN",
+                ]
+            ),
+        )
+
+    def test_call_checks_come_before_arguments(self):
+        [statement] = parse("f(g(1), 2)")
+        listing = disassemble(Compiler.compile(statement)).splitlines()
+        self.assertEqual(listing[0], "   0 LOAD_FUNC     0 (('f', 2))")
+        self.assertEqual(listing[1], "   1 LOAD_FUNC     1 (('g', 1))")
+        with self.assertRaisesRegex(RuntimeError, "Function f not defined."):
+            Interpreter("bytecode").evaluate(statement)
+
+    def test_constants_keep_their_type_and_sign(self):
+        code = Compiler.compile(Call(Variable("f"), [Number(0.0), Number(-0.0), Number(0)]))
+        self.assertEqual([str(value) for value in code.consts[1:]], ["0.0", "-0.0", "0"])
+
+    def test_pickled_code_runs(self):
+        source = "def sq(a) = { a * a } k = 3 sq(k) + 1"
+        codes = pickle.loads(pickle.dumps([Compiler.compile(s) for s in parse(source)]))
+        vm = Interpreter("bytecode").vm
+        self.assertEqual([vm.run(code) for code in codes], [None, 3, 10])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import math
+import unittest
+from _tokenizer import Tokenizer
+from interpreter import Interpreter
+from parser import Parser
+
+
+def run(interpreter, source):
+    return [interpreter.evaluate(s) for s in Parser(Tokenizer(source).scan_tokens()).parse()]
+
+
+class TestCallMemo(unittest.TestCase):
+    ENGINES = ("tree", "closure")
+
+    def test_repeated_calls_hit(self):
+        for engine in self.ENGINES:
+            interpreter = Interpreter(engine, memoize=True)
+            source = "def sq(a) = { a * a } def f(a) = { sq(a) + k } k = 1 f(3) f(3) f(4) k = 2 f(3)"
+            self.assertEqual(run(interpreter, source), [None, None, 1, 10, 10, 17, 2, 11], engine)
+            cache = interpreter.memo.cache
+            # The second f(3) hits; once k changed, f(3) misses but sq(3) still hits
+            self.assertEqual((cache.hits, cache.misses), (2, 5), engine)
+            self.assertAlmostEqual(cache.hit_rate, 2 / 7)
+
+    def test_keys_follow_dynamic_scoping_and_types(self):
+        for engine in self.ENGINES:
+            interpreter = Interpreter(engine, memoize=True)
+            source = "def get() = { x * 3 } def outer(x) = { get() } outer(1) outer(2) outer(2 / 2) outer(1)"
+            self.assertEqual(run(interpreter, source), [None, None, 3, 6, 3.0, 3], engine)
+
+    def test_keys_keep_the_sign_of_zero(self):
+        for engine in self.ENGINES:
+            interpreter = Interpreter(engine, memoize=True)
+            zero, negative_zero = run(interpreter, "def f(a) = { a * 3 } f(0 / 1) f(-(0 / 1))")[1:]
+            self.assertEqual(math.copysign(1, zero), 1, engine)
+            self.assertEqual(math.copysign(1, negative_zero), -1, engine)
+
+    def test_redefinition_clears(self):
+        for engine in self.ENGINES:
+            interpreter = Interpreter(engine, memoize=True)
+            source = "def g(a) = { a } def f(a) = { g(a) + 1 } f(1) def g(a) = { a * 10 } f(1)"
+            self.assertEqual(run(interpreter, source), [None, None, 2, None, 11], engine)
+
+    def test_functions_that_define_are_not_memoized(self):
+        for engine in self.ENGINES:
+            interpreter = Interpreter(engine, memoize=True)
+            run(interpreter, "def make() = { def made() = { 1 } } make() make()")
+            self.assertEqual(len(interpreter.memo.cache), 0, engine)
+            self.assertIn("made", interpreter.functions)
+
+    def test_other_engines_are_refused(self):
+        with self.assertRaises(ValueError):
+            Interpreter("stack", memoize=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
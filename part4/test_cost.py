@@ -0,0 +1,90 @@
+import math
+import time
+import unittest
+from _token import TokenType
+from _tokenizer import Tokenizer
+from abstract_syntax_tree import Binary, Call, Definition, Number, Variable
+from budget import Budget
+from cost import HUGE, estimate
+from interpreter import Interpreter
+from parser import Parser
+
+
+def parse(source):
+    return Parser(Tokenizer(source).scan_tokens()).parse()
+
+
+class TestCost(unittest.TestCase):
+    def test_counts(self):
+        source = "def sq(x) = { x * x } def f(a) = { sq(a) + sq(1) } f(2) + 1"
+        cost = estimate(parse(source))
+        self.assertEqual((cost.nodes, cost.depth), (14, 3))
+        self.assertEqual(cost.fan_out, {"sq": 0, "f": 1})
+        self.assertEqual((cost.evaluated_nodes, cost.calls, cost.call_depth), (17, 3, 2))
+
+        # Without redefinitions the bounds are exact
+        budget = Budget()
+        interpreter = Interpreter(budget=budget)
+        nodes = calls = 0
+        for statement in parse(source):
+            interpreter.evaluate(statement)
+            nodes, calls = nodes + budget.nodes, calls + budget.calls
+        self.assertEqual((nodes, calls), (17, 3))
+
+    def test_recursion_is_unbounded(self):
+        cost = estimate(parse("def f(a) = { g(a) } def g(a) = { f(a) + 1 } def h() = { 1 } h()"))
+        self.assertEqual((cost.evaluated_nodes, cost.calls, cost.call_depth), (5, 1, 1))
+        cost = estimate(parse("def f(a) = { g(a) } def g(a) = { f(a) + 1 } f(1)"))
+        self.assertEqual((cost.evaluated_nodes, cost.calls, cost.call_depth), (None, None, None))
+        self.assertFalse(cost.within(Budget(max_nodes=10**6)))
+        self.assertTrue(cost.within(Budget(max_bits=64)))
+
+    def test_bounds_integer_sizes(self):
+        cost = estimate(parse("2 ** 10 * 3"))
+        self.assertEqual(cost.max_bits, 13)
+        cost = estimate(parse("9 ** 9 ** 9"))
+        self.assertGreaterEqual(cost.max_bits, 9**9 * math.log2(9))
+        self.assertFalse(cost.within(Budget(max_bits=4096)))
+        cost = estimate(parse("x = 3 ** 40 y = x * x z = f(x) z + 1"))
+        self.assertEqual(cost.max_bits, 2 * (math.floor(40 * math.log2(3)) + 1))
+        self.assertTrue(cost.within(Budget(max_bits=4096)))
+
+        interpreter = Interpreter()
+        for statement in parse("k = 2 ** 100 def f(a) = { a + k }"):
+            interpreter.evaluate(statement)
+        cost = interpreter.estimate("f(k) + k * k")
+        self.assertEqual((cost.evaluated_nodes, cost.max_bits), (9, 202))
+
+    def test_unbounded_operands_are_unbounded(self):
+        # A * or ** of a call's result or a parameter could build anything
+        for source in [
+            "x = 3 ** 40 z = f(x) z ** z",
+            "def f(a) = { a ** a ** a } f(9)",
+            "def f(a) = { a * a } x = 2 ** 40 f(x) * f(x)",
+        ]:
+            cost = estimate(parse(source))
+            self.assertIsNone(cost.max_bits, source)
+            self.assertFalse(cost.within(Budget(max_bits=64)), source)
+            self.assertTrue(cost.within(Budget(max_nodes=100)), source)
+        self.assertEqual(estimate(parse("def f(a) = { 1 ** a + a } f(2 ** 70)")).max_bits, 71)
+
+    def test_linear_time(self):
+        # Each function calls the one before twice: 2 ** 5000 calls, estimated at once
+        statements = [Definition("f0", ["a"], Variable("a"))]
+        for i in range(1, 5000):
+            call = Call(Variable(f"f{i - 1}"), [Variable("a")])
+            statements.append(Definition(f"f{i}", ["a"], Binary(call, TokenType.PLUS, call)))
+        expr = Number(2)
+        for _ in range(20000):
+            expr = Binary(expr, TokenType.EXPONENT, Number(2))
+        statements += [Call(Variable("f4999"), [Number(1)]), expr]
+
+        start = time.monotonic()
+        cost = estimate(statements)
+        self.assertLess(time.monotonic() - start, 2)
+        self.assertEqual((cost.evaluated_nodes, cost.calls, cost.call_depth), (HUGE, HUGE, 5000))
+        self.assertEqual((cost.depth, cost.max_bits), (20001, HUGE))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import random
+import unittest
+from _tokenizer import Tokenizer
+from incremental import Document
+from parser import Parser
+
+
+def parse(source):
+    return Parser(Tokenizer(source).scan_tokens()).parse()
+
+
+class TestIncremental(unittest.TestCase):
+    def assertMatchesFullParse(self, document):
+        tokens = Tokenizer(document.source).scan_tokens()
+        self.assertEqual(
+            [(t.type, t.lexeme, t.value) for t in document.tokens],
+            [(t.type, t.lexeme, t.value) for t in tokens],
+        )
+        self.assertEqual(repr(document.statements), repr(Parser(tokens).parse()))
+
+    def test_edit_reuses_untouched_statements(self):
+        document = Document("x = 1\ny = 2\nz = x + y\n")
+        first, second, third = document.statements
+        changed = document.edit(4, 1, "10")
+        self.assertEqual(list(changed), [0])
+        self.assertEqual(document.source, "x = 10\ny = 2\nz = x + y\n")
+        self.assertIsNot(document.statements[0], first)
+        self.assertIs(document.statements[1], second)
+        self.assertIs(document.statements[2], third)
+        self.assertMatchesFullParse(document)
+
+    def test_edit_joins_statements(self):
+        document = Document("1\n2\n3")
+        document.edit(1, 0, " +")
+        self.assertEqual(len(document.statements), 2)
+        self.assertMatchesFullParse(document)
+
+    def test_edit_merges_tokens(self):
+        document = Document("ab cd * * 2")
+        document.edit(2, 1, "")
+        document.edit(6, 1, "")
+        self.assertEqual(document.source, "abcd ** 2")
+        self.assertMatchesFullParse(document)
+
+    def test_syntax_error_then_fix(self):
+        document = Document("x = 1\ny = (2)\nz = 3")
+        with self.assertRaises(SyntaxError):
+            document.edit(document.source.index(")"), 1, "")
+        self.assertEqual(len(document.statements), 1)
+        with self.assertRaises(SyntaxError):
+            document.edit(0, 0, "w = 0\n")
+        self.assertEqual(len(document.statements), 2)
+        document.edit(document.source.index("(2") + 2, 0, ")")
+        self.assertMatchesFullParse(document)
+
+    def test_random_edits(self):
+        rng = random.Random(4)
+        pieces = ["x", "yy", "1", "23", " ", "\n", "+", "-", "*", "/", "(", ")", "=", "f", ",", "def f(a) = { a }"]
+        document = Document("def f(a) = { a * 2 }\nx = 1\nyy = f(x) + 3\n")
+        for _ in range(500):
+            offset = rng.randrange(len(document.source) + 1)
+            deleted = rng.randrange(min(3, len(document.source) - offset) + 1)
+            inserted = "".join(rng.choice(pieces) for _ in range(rng.randrange(3)))
+            try:
+                parse(document.source[:offset] + inserted + document.source[offset + deleted :])
+            except SyntaxError:
+                with self.assertRaises(SyntaxError):
+                    document.edit(offset, deleted, inserted)
+                continue
+            document.edit(offset, deleted, inserted)
+            self.assertMatchesFullParse(document)
+
+
+if __name__ == "__main__":
+    unittest.main()
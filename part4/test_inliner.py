@@ -0,0 +1,110 @@
+import unittest
+from _tokenizer import Tokenizer
+from inliner import Inliner
+from interpreter import Interpreter
+from optimizer import Optimizer
+from parser import Parser
+from runner import run
+
+
+def parse(source):
+    return Parser(Tokenizer(source).scan_tokens()).parse()
+
+
+def outcome(interpreter, statements):
+    try:
+        return repr(interpreter.evaluate(statements[0]))
+    except Exception as error:
+        return type(error)
+    finally:
+        for statement in statements[1:]:
+            interpreter.evaluate(statement)
+
+
+class TestInliner(unittest.TestCase):
+    def test_inlines_small_functions(self):
+        inliner = Inliner()
+        statements = inliner.inline(
+            parse("def sq(x) = { x * x } def f(a) = { sq(a) + k } def g(b) = { sq(2) - f(b) + f(sq(b)) } sq(b)")
+        )
+        self.assertEqual(
+            statements,
+            parse(
+                "def sq(x) = { x * x } def f(a) = { a * a + k } def g(b) = { 2 * 2 - (b * b + k) + f(b * b) } sq(b)"
+            ),
+        )
+        self.assertEqual(inliner.inlined, 4)
+
+    def test_leaves_other_calls_alone(self):
+        source = """
+            def sq(x) = { x * x } def one(x) = { 1 } def big(x) = { x + x + x + x + x + x + x + x + x }
+            def fact(n) = { n * fact(n - 1) } def set(v) = { k = v }
+            def t(a) = { sq(a + 1) + sq(1, 2) + one(a) + big(a) + fact(a) + set(a) + g(a) }
+        """
+        inliner = Inliner()
+        self.assertEqual(inliner.inline(parse(source)), parse(source))
+        self.assertEqual(inliner.inlined, 0)
+        self.assertEqual(set(inliner.leaves), {"sq", "one"})
+
+    def test_redefinition_reinlines(self):
+        inliner = Inliner()
+        statements = inliner.inline(
+            parse("def sq(x) = { x * x } def g(a) = { sq(a) + 1 } def h(b) = { g(b) * 2 } def sq(x) = { x + x }")
+        )
+        self.assertEqual(
+            statements,
+            parse(
+                """
+                def sq(x) = { x * x } def g(a) = { a * a + 1 } def h(b) = { (b * b + 1) * 2 }
+                def sq(x) = { x + x } def g(a) = { a + a + 1 } def h(b) = { (b + b + 1) * 2 }
+                """
+            ),
+        )
+        self.assertEqual(inliner.reinlined, 2)
+
+    def test_functions_defined_in_bodies_are_not_inlined(self):
+        inliner = Inliner()
+        statements = inliner.inline(
+            parse("def n(x) = { x } def g(a) = { n(a) } def m() = { def n(x) = { x + 1 } } n(1)")
+        )
+        self.assertEqual(
+            statements,
+            parse("def n(x) = { x } def g(a) = { a } def m() = { def n(x) = { x + 1 } } def g(a) = { n(a) } n(1)"),
+        )
+
+    def test_same_results(self):
+        source = """
+            def sq(x) = { x * x }
+            def f(a) = { sq(a) + k }
+            k = 3
+            f(2) + sq(k)
+            def f(a) = { sq(a) - missing }
+            f(2)
+            def g(a) = { f(a) * sq(a) }
+            def sq(x) = { x / 2 }
+            g(4) + sq(1)
+            def m() = { def sq(x) = { x ** 3 } }
+            def h(a) = { sq(a) }
+            m()
+            h(2) + g(k) + f(unset)
+            def sq(x, y) = { x + y }
+            sq(k, 1) + sq(k)
+        """
+        statements = parse(source)
+        inliner = Inliner()
+        inlined = [inliner.inline_statement(statement) for statement in statements]
+        self.assertTrue(inliner.inlined)
+        for engine in Interpreter.ENGINES:
+            interpreter = Interpreter(engine)
+            expected = [outcome(interpreter, [statement]) for statement in statements]
+            interpreter = Interpreter(engine)
+            results = [outcome(interpreter, statements) for statements in inlined]
+            self.assertEqual(results, expected, engine)
+
+        source = "def sq(x) = { x * x } y = 3 sq(y) + sq(2) def sq(x) = { x } def f(a) = { sq(a) } f(4)"
+        expected = list(run([source]))
+        self.assertEqual(list(run([source], inliner=Inliner(), optimizer=Optimizer())), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
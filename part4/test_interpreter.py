@@ -0,0 +1,116 @@
+import unittest
+from abstract_syntax_tree import Interner
+from _tokenizer import Tokenizer
+from interpreter import Interpreter
+from parser import Parser
+from stack_parser import StackParser
+
+
+def run(interpreter, source, parser_class=Parser):
+    results = []
+    for statement in parser_class(Tokenizer(source).scan_tokens()).parse():
+        results.append(interpreter.evaluate(statement))
+    return results
+
+
+class TestInterpreter(unittest.TestCase):
+    PROGRAM = """
+        def sq(x) = { x * x }
+        def hyp(a, b) = { sq(a) + sq(b) }
+        def scaled(v) = { v * k }
+        k = 3
+        hyp(3, 4)
+        (-sq(2)) ** 2 / 8
+        scaled(2 ** 10)
+        2 ** -1
+        def inner() = { k = 100 }
+        inner()
+        k
+    """
+
+    def test_engines_agree(self):
+        expected = run(Interpreter(), self.PROGRAM)
+        self.assertEqual(expected, [None, None, None, 3, 25, 2.0, 3072, 0.5, None, 100, 3])
+        for engine in Interpreter.ENGINES:
+            self.assertEqual(run(Interpreter(engine), self.PROGRAM), expected, engine)
+
+    def test_engines_raise_the_same_errors(self):
+        for source, error in [
+            ("missing(1)", "Function missing not defined."),
+            ("def f(a) = { a } f(1, 2)", "takes 1 arguments, but got 2"),
+            ("1 +", "Unknown expression: None"),
+        ]:
+            for engine in Interpreter.ENGINES:
+                with self.assertRaisesRegex(RuntimeError, error):
+                    run(Interpreter(engine), source)
+        for engine in Interpreter.ENGINES:
+            # The slots engine's resolver catches missing variables up front
+            with self.assertRaises(NameError if engine == "slots" else KeyError):
+                run(Interpreter(engine), "undefined + 1")
+            with self.assertRaises(ZeroDivisionError):
+                run(Interpreter(engine), "1 / 0")
+
+    def test_stack_engine_deep_nesting(self):
+        depth = 20000
+        source = "(" * depth + "1" + " + 1)" * depth
+        self.assertEqual(run(Interpreter("stack"), source, StackParser), [depth + 1])
+        source = " ** ".join(["1"] * depth)
+        self.assertEqual(run(Interpreter("stack"), source, StackParser), [1])
+
+    def test_closure_engine_follows_redefinitions(self):
+        interpreter = Interpreter("closure")
+        source = "def f(a) = { a + 1 } def g(a) = { f(a) * 2 } g(1) def f(a) = { a - 1 } g(1)"
+        self.assertEqual(run(interpreter, source), [None, None, 4, None, 0])
+        # Functions added behind the compiler's back still run
+        [definition] = Parser(Tokenizer("def h() = { 7 }").scan_tokens()).parse()
+        interpreter.functions["h"] = definition
+        self.assertEqual(run(interpreter, "h()"), [7])
+
+    def test_calls_share_the_callers_variables(self):
+        source = """
+            def get() = { x + y }
+            def set(x) = { y = x * 10 }
+            def outer(x) = { get() }
+            y = 1
+            outer(5)
+            set(7)
+            y
+        """
+        for engine in Interpreter.ENGINES:
+            interpreter = Interpreter(engine)
+            variables = interpreter.variables
+            self.assertEqual(run(interpreter, source), [None, None, None, 1, 6, 70, 1], engine)
+            # The top-level variables were never copied or replaced
+            self.assertIs(interpreter.variables, variables)
+            with self.assertRaises(NameError if engine == "slots" else KeyError):
+                run(Interpreter(engine), "def f() = { x } f()")
+
+    def test_failed_calls_restore_the_callers_variables(self):
+        for engine in Interpreter.ENGINES:
+            interpreter = Interpreter(engine)
+            variables = interpreter.variables
+            with self.assertRaises(ZeroDivisionError):
+                run(interpreter, "def g(a) = { a / 0 } def h(a) = { g(a + 1) } h(1)")
+            self.assertIs(interpreter.variables, variables, engine)
+            self.assertEqual(run(interpreter, "y = 3 y"), [3, 3], engine)
+            self.assertEqual(interpreter.variables, {"y": 3}, engine)
+
+    def test_reuse_shared(self):
+        interpreter = Interpreter(reuse_shared=True)
+        self.assertEqual(run(interpreter, self.PROGRAM), run(Interpreter(), self.PROGRAM))
+
+        interpreter = Interpreter(reuse_shared=True)
+        parser = Parser(Tokenizer("x = 2 (x + 1) * (x + 1) x = 3 (x + 1) * (x + 1)").scan_tokens(), Interner())
+        self.assertEqual([interpreter.evaluate(s) for s in parser.parse()], [2, 9, 3, 16])
+        # Only the values since x last changed are kept
+        self.assertEqual(len(interpreter.shared_values), 2)
+
+    def test_unknown_engine(self):
+        with self.assertRaises(ValueError):
+            Interpreter("jit")
+        with self.assertRaises(ValueError):
+            Interpreter("stack", reuse_shared=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
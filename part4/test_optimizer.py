@@ -0,0 +1,68 @@
+import unittest
+from _tokenizer import Tokenizer
+from abstract_syntax_tree import Number
+from interpreter import Interpreter
+from optimizer import Optimizer
+from parser import Parser
+from runner import run
+
+
+def parse(source):
+    return Parser(Tokenizer(source).scan_tokens()).parse()
+
+
+class TestOptimizer(unittest.TestCase):
+    def test_folds_constant_arithmetic(self):
+        optimizer = Optimizer()
+        self.assertEqual(optimizer.optimize(parse("-(4 / 8) 2 ** 10 * 3")), [Number(-0.5), Number(3072)])
+        self.assertEqual(
+            optimizer.optimize(parse("def f(a) = { a * (2 + 3) }")), parse("def f(a) = { a * 5 }")
+        )
+        self.assertEqual(len(optimizer.folds), 5)
+
+    def test_propagates_constants(self):
+        optimizer = Optimizer()
+        statements = optimizer.optimize(parse("x = 2 + 3 y = x * x x = z x + 1 y"))
+        self.assertEqual(statements, parse("x = 5 y = 25 x = z x + 1 25"))
+        self.assertEqual(optimizer.propagated, 3)
+
+    def test_leaves_function_bodies_and_calls_alone(self):
+        # f reads k from its caller, and g may assign k
+        source = "k = 1 def f() = { k } def g() = { k = 2 } g() + k k"
+        optimizer = Optimizer()
+        statements = optimizer.optimize(parse(source))
+        self.assertEqual(statements, parse(source))
+        self.assertEqual(optimizer.propagated, 0)
+
+    def test_unsafe_folds_are_left_to_run_time(self):
+        optimizer = Optimizer(max_bits=64)
+        statements = parse("1 / 0 2 ** 100 2 ** 63 (2 ** 40) * (2 ** 40)")
+        self.assertEqual(
+            optimizer.optimize(statements),
+            [statements[0], statements[1], Number(2**63), parse("1099511627776 * 1099511627776")[0]],
+        )
+
+    def test_same_results(self):
+        source = """
+            def sq(x) = { x * x + (1 - 1) }
+            k = 2 ** 3
+            j = sq(k) + k
+            def scaled(v) = { v * k }
+            scaled(j) - -k / 4
+            k = 1 + k
+            j + k
+        """
+        interpreter = Interpreter()
+        expected = [interpreter.evaluate(statement) for statement in parse(source)]
+        optimized = Optimizer().optimize(parse(source))
+        for engine in Interpreter.ENGINES:
+            interpreter = Interpreter(engine)
+            self.assertEqual([interpreter.evaluate(s) for s in optimized], expected, engine)
+
+        optimizer = Optimizer()
+        self.assertEqual(list(run(source.splitlines(True), optimizer=optimizer)), expected)
+        self.assertTrue(optimizer.folds)
+
+
+if __name__ == "__main__":
+    unittest.main()
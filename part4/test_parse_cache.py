@@ -0,0 +1,46 @@
+import unittest
+from interpreter import Interpreter
+from parse_cache import ParseCache
+
+
+class TestParseCache(unittest.TestCase):
+    def test_hits_and_misses(self):
+        cache = ParseCache()
+        first = cache.parse("x = 1 + 2")
+        self.assertIs(cache.parse("x = 1 + 2"), first)
+        cache.parse("y = 3")
+        self.assertEqual((cache.cache.hits, cache.cache.misses), (1, 2))
+
+    def test_entry_budget_evicts_least_recently_used(self):
+        cache = ParseCache(max_entries=2)
+        cache.parse("1")
+        cache.parse("2")
+        cache.parse("1")
+        cache.parse("3")  # Evicts "2", the least recently used
+        self.assertEqual(cache.cache.evictions, 1)
+        cache.parse("1")
+        cache.parse("2")
+        self.assertEqual((cache.cache.hits, cache.cache.misses), (2, 4))
+
+    def test_byte_budget(self):
+        cache = ParseCache(max_bytes=10)
+        cache.parse("1 + 2 + 3")
+        cache.parse("4 + 5")
+        self.assertEqual(len(cache.cache), 1)
+        self.assertLessEqual(cache.cache.size, 10)
+        cache.parse("1 + 2 + 3 + 4 + 5")  # Larger than the whole budget
+        self.assertEqual(len(cache.cache), 1)
+
+    def test_evaluation_leaves_cached_trees_alone(self):
+        cache = ParseCache()
+        source = "def f(a) = { a * k } k = 2 f(3)"
+        expected = repr(cache.parse(source))
+        interpreter = Interpreter()
+        for _ in range(2):
+            results = [interpreter.evaluate(statement) for statement in cache.parse(source)]
+            self.assertEqual(results, [None, 2, 6])
+        self.assertEqual(repr(cache.parse(source)), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -181,6 +181,12 @@ class TestParser(unittest.TestCase):
         self.assertIsInstance(expression.value.right, Number)
         self.assertEqual(expression.value.right.value, 2)
 
+    def test_token_buffer(self):
+        source = "def f(a, b) = { a * -b }\nx = f(1, 2) ** (3 + 4) / 5"
+        expected = Parser(Tokenizer(source).scan_tokens()).parse()
+        buffer = Tokenizer(source, engine="table").scan_tokens(buffer=True)
+        self.assertEqual(repr(Parser(buffer).parse()), repr(expected))
+
 
 if __name__ == "__main__":
     unittest.main()
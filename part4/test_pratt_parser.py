@@ -0,0 +1,46 @@
+import random
+import unittest
+from _tokenizer import Tokenizer
+from parser import Parser
+from pratt_parser import PrattParser
+
+
+def parse(parser_class, source):
+    try:
+        return repr(parser_class(Tokenizer(source).scan_tokens()).parse())
+    except SyntaxError:
+        return SyntaxError
+
+
+class TestPrattParser(unittest.TestCase):
+    def assertSameTrees(self, source):
+        self.assertEqual(parse(PrattParser, source), parse(Parser, source), source)
+
+    def test_precedence_and_associativity(self):
+        for source in [
+            "1 + 2 * 3 - 4 / 5",
+            "1 - 2 - 3",
+            "2 ** 3 ** 4",
+            "-2 ** 2",
+            "2 ** -3 ** 2",
+            "--+1 * -x",
+            "(1 + 2) * (3 - (4 / y))",
+            "x = f(1, g(2) ** 3, -z) / 2",
+            "def f(a, b) = { a * b + 1 }",
+        ]:
+            self.assertSameTrees(source)
+
+    def test_incomplete_expressions(self):
+        for source in ["1 +", "- * 2", "f(1,)", "()", "(1 + 2", "f(1"]:
+            self.assertSameTrees(source)
+
+    def test_random_token_sequences(self):
+        rng = random.Random(6)
+        vocabulary = ["1", "23", "x", "f", "+", "-", "*", "/", "**", "(", ")", ",", "="]
+        for _ in range(3000):
+            source = " ".join(rng.choice(vocabulary) for _ in range(rng.randrange(1, 12)))
+            self.assertSameTrees(source)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+from _tokenizer import Tokenizer
+from interpreter import Interpreter
+from parser import Parser
+
+
+def session(source, engine="tree"):
+    interpreter = Interpreter(engine)
+    for statement in Parser(Tokenizer(source).scan_tokens()).parse():
+        interpreter.evaluate(statement)
+    return interpreter
+
+
+class TestPreparedStatement(unittest.TestCase):
+    def test_runs_with_new_bindings(self):
+        for engine in Interpreter.ENGINES:
+            interpreter = session("k = 10 def f(a, b) = { a * b + k }", engine)
+            prepared = interpreter.prepare("t = f(x, y) t - x / 2", ["x", "y"])
+            self.assertEqual(prepared.run(x=2, y=3), 15.0, engine)
+            self.assertEqual(prepared.run(y=0, x=4), 8.0, engine)
+            self.assertEqual(interpreter.variables, {"k": 10}, engine)
+
+    def test_sees_the_session_as_it_is(self):
+        interpreter = session("k = 1 def f(a) = { a + k }")
+        prepared = interpreter.prepare("f(x)", ["x"])
+        self.assertEqual(prepared.run(x=1), 2)
+        for statement in Parser(Tokenizer("k = 5 def f(a) = { a * k }").scan_tokens()).parse():
+            interpreter.evaluate(statement)
+        self.assertEqual(prepared.run(x=2), 10)
+
+    def test_errors(self):
+        interpreter = session("k = 1")
+        with self.assertRaises(NameError):
+            interpreter.prepare("x + z", ["x"])
+        with self.assertRaises(ValueError):
+            interpreter.prepare("def f(a) = { a }")
+        with self.assertRaises(ValueError):
+            interpreter.prepare("x", ["x", "x"])
+
+        prepared = interpreter.prepare("x + k", ["x"])
+        with self.assertRaises(TypeError):
+            prepared.run()
+        with self.assertRaises(TypeError):
+            prepared.run(x=1, y=2)
+        with self.assertRaises(RuntimeError):
+            interpreter.prepare("g(x)", ["x"]).run(x=1)
+        self.assertEqual(interpreter.variables, {"k": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+from _token import TokenType
+from _tokenizer import Tokenizer
+from abstract_syntax_tree import Binary, Call, Definition, Number, Variable
+from interpreter import Interpreter
+from parser import Parser
+
+
+def parse(source):
+    return Parser(Tokenizer(source).scan_tokens()).parse()
+
+
+class TestPythonBackend(unittest.TestCase):
+    def test_source(self):
+        backend = Interpreter("python").backend
+        [statement] = parse("def f(a) = { k = -a ** 2 / f(a, 1) }")
+        source, consts = backend.source(statement)
+        self.assertEqual(
+            source,
+            "def __body_0():\n"
+            "    return __assign('k', (((-__state.variables['a']) ** 2) / "
+            "__call(__lookup('f', 2), __state.variables['a'], 1)))\n"
+            "__result = __define(__consts[0], __body_0)\n",
+        )
+        self.assertEqual(consts, [statement])
+
+    def test_falls_back_when_python_cannot_compile(self):
+        # Python refuses to parse parentheses nested this deeply
+        depth = 300
+        body = Number(1)
+        for _ in range(depth):
+            body = Binary(Variable("a"), TokenType.PLUS, body)
+        interpreter = Interpreter("python")
+        self.assertIsNone(interpreter.evaluate(Definition("f", ["a"], body)))
+        [call] = parse("f(1)")
+        self.assertEqual(interpreter.evaluate(call), depth + 1)
+
+    def test_negative_literal_bases(self):
+        # A folded (-5) is Number(-5), which must stay the base of **
+        square = Definition("f", ["y"], Binary(Number(-5), TokenType.EXPONENT, Variable("y")))
+        statements = [square, Call(Variable("f"), [Number(2)]), Binary(Number(-2), TokenType.EXPONENT, Number(3))]
+        for engine in Interpreter.ENGINES:
+            interpreter = Interpreter(engine)
+            self.assertEqual([interpreter.evaluate(s) for s in statements], [None, 25, -8], engine)
+
+    def test_huge_numbers(self):
+        interpreter = Interpreter("python")
+        [statement] = parse("x = 2 ** 20000")
+        value = interpreter.evaluate(statement)
+        statement = Binary(Variable("x"), TokenType.MULTIPLY, Number(value))
+        self.assertEqual(interpreter.evaluate(statement), value * value)
+
+
+if __name__ == "__main__":
+    unittest.main()
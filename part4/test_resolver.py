@@ -0,0 +1,51 @@
+import unittest
+from _tokenizer import Tokenizer
+from interpreter import Interpreter
+from parser import Parser
+from resolver import Resolver
+
+
+def parse(source):
+    return Parser(Tokenizer(source).scan_tokens()).parse()
+
+
+class TestResolver(unittest.TestCase):
+    def test_top_level_reads(self):
+        Resolver().resolve(parse("x = 1 y = x + 1 y * x"))
+        with self.assertRaisesRegex(NameError, "Variable y not defined."):
+            Resolver().resolve(parse("x = 1 x + y"))
+        with self.assertRaisesRegex(NameError, "Variables x, y not defined."):
+            Resolver().resolve(parse("x = x + y"))
+        Resolver(names=["y"]).resolve(parse("x = y"))
+
+    def test_calls_need_what_callers_do_not_provide(self):
+        resolver = Resolver()
+        resolver.resolve(parse("def get() = { x + y } def outer(x) = { get() } y = 1 outer(5)"))
+        with self.assertRaisesRegex(NameError, "Variable x not defined."):
+            resolver.check(parse("get()")[0])
+        # Calls to functions that don't exist are the interpreter's to report
+        resolver.check(parse("missing(y)")[0])
+
+    def test_recursion_and_redefinition(self):
+        resolver = Resolver()
+        resolver.resolve(parse("def f(a) = { g(a) + b } def g(c) = { f(c) * a }"))
+        with self.assertRaisesRegex(NameError, "Variable b not defined."):
+            resolver.check(parse("f(1)")[0])
+        with self.assertRaisesRegex(NameError, "Variables a, b not defined."):
+            resolver.check(parse("g(1)")[0])
+
+        resolver.resolve(parse("b = 2 f(1) def g(c) = { c }"))
+        resolver.check(parse("g(1)")[0])
+
+    def test_slots_engine(self):
+        interpreter = Interpreter("slots")
+        source = "def sq(a) = { a * a } def add(a) = { sq(a) + a + b } b = 1 add(3) def sq(a) = { a } add(3)"
+        self.assertEqual([interpreter.evaluate(s) for s in parse(source)], [None, None, 1, 13, None, 7])
+        self.assertEqual(interpreter.compiler.frames, [])
+        with self.assertRaisesRegex(NameError, "Variable c not defined."):
+            for statement in parse("def add(a) = { a + c } add(1)"):
+                interpreter.evaluate(statement)
+
+
+if __name__ == "__main__":
+    unittest.main()
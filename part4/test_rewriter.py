@@ -0,0 +1,108 @@
+import random
+import unittest
+from _token import TokenType
+from _tokenizer import Tokenizer
+from abstract_syntax_tree import Assignment, Binary, Call, Definition, Number, Unary, Variable
+from interpreter import Interpreter
+from optimizer import Optimizer
+from parser import Parser
+from rewriter import Rewriter
+
+OPERATORS = [TokenType.PLUS, TokenType.MINUS, TokenType.MULTIPLY, TokenType.DIVIDE, TokenType.EXPONENT]
+INTS = [0, 1, -1, 2, 3, 7, -2**62, 10**400]
+FLOATS = [0.0, -0.0, 0.1, -2.5, 1e308, 3.0]
+
+
+def parse(source):
+    return Parser(Tokenizer(source).scan_tokens()).parse()
+
+
+def random_expression(rng, depth, calls=True):
+    if depth == 0 or rng.random() < 0.2:
+        if rng.random() < 0.6:
+            return Variable(rng.choice("ab"))
+        return Number(rng.choice([0, 1, 2, 4, 3, 0.5, 2.0]))
+    choice = rng.random()
+    if choice < 0.2:
+        operator = rng.choice([TokenType.MINUS, TokenType.PLUS])
+        return Unary(operator, random_expression(rng, depth - 1, calls))
+    if choice < 0.3 and calls:
+        return Call(Variable("f"), [random_expression(rng, depth - 1, calls)])
+    operator = rng.choice(OPERATORS)
+    left = random_expression(rng, depth - 1, calls)
+    if operator == TokenType.EXPONENT:
+        # Keep powers small enough to evaluate
+        return Binary(left, operator, Number(rng.choice([0, 1, 2, 3, -1])))
+    return Binary(left, operator, random_expression(rng, depth - 1, calls))
+
+
+def outcome(interpreter, statements):
+    results = []
+    for statement in statements:
+        try:
+            results.append(repr(interpreter.evaluate(statement)))
+        except Exception as error:
+            results.append(type(error))
+    return results
+
+
+class TestRewriter(unittest.TestCase):
+    def test_rewrites(self):
+        rewriter = Rewriter()
+        halved = Binary(Variable("a"), TokenType.DIVIDE, Number(2))
+        self.assertEqual(
+            rewriter.rewrite(parse("--(a / 2) * 1 - 0 (+(a / 2)) ** 1 1 * (a / 2 / 4) a + 0 a ** 2")),
+            [
+                halved,
+                halved,
+                Binary(halved, TokenType.MULTIPLY, Number(0.25)),
+                Binary(Variable("a"), TokenType.PLUS, Number(0)),
+                Binary(Variable("a"), TokenType.EXPONENT, Number(2)),
+            ],
+        )
+        self.assertEqual(
+            Rewriter(integers=True).rewrite(parse("--a * 1 - 0 (+b) ** 1 a + 0 a ** 2")),
+            [Variable("a"), Variable("b"), Variable("a"), Binary(Variable("a"), TokenType.MULTIPLY, Variable("a"))],
+        )
+
+    def test_leaves_operands_that_may_not_be_numbers(self):
+        # a may hold the None that a call to g returns, and then each of
+        # these raises a TypeError
+        source = "--a +a a * 1 1 * a a - 0 a ** 1"
+        self.assertEqual(Rewriter().rewrite(parse(source)), parse(source))
+        statements = parse("def g() = { def h() = { 2 } } x = g() x * 1")
+        self.assertEqual(outcome(Interpreter(), Rewriter().rewrite(statements)), ["None", "None", TypeError])
+
+    def test_shares_common_subexpressions(self):
+        [statement] = Rewriter().rewrite(parse("def f(a) = { (a + b) * (a + b) + f(a + b) }"))
+        product = statement.body.left
+        self.assertIs(product.left, product.right)
+        self.assertIs(statement.body.right.arguments[0], product.left)
+
+    def test_keeps_the_sign_of_zero(self):
+        # The optimizer folds the arguments to Number(0.0) and Number(-0.0)
+        statements = Rewriter().rewrite(Optimizer().optimize(parse("def g(a, b) = { b } g(0 / 1, -(0 / 1))")))
+        self.assertEqual(outcome(Interpreter(), statements), ["None", "-0.0"])
+
+    def test_same_results_as_the_interpreter(self):
+        rng = random.Random(1234)
+        # A call to nothing() returns None, as any function whose body is a def does
+        nothing = Definition("nothing", [], Definition("inner", [], Number(2)))
+        for integers, values in [(False, INTS + FLOATS + [None]), (True, INTS)]:
+            for _ in range(300):
+                body = random_expression(rng, 3, calls=False)
+                statements = [nothing, Definition("f", ["a"], body)]
+                for name in "ab":
+                    value = rng.choice(values)
+                    literal = Call(Variable("nothing"), []) if value is None else Number(value)
+                    statements.append(Assignment(name, literal))
+                # Shallow ones too, which are often a lone rewrite of a or b
+                statements += [random_expression(rng, 1), random_expression(rng, 4)]
+                rewritten = Rewriter(integers).rewrite(statements)
+                expected = outcome(Interpreter(), statements)
+                self.assertEqual(outcome(Interpreter(), rewritten), expected, statements)
+                self.assertEqual(outcome(Interpreter(reuse_shared=True), rewritten), expected, statements)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,31 @@
+import unittest
+from runner import run
+
+
+class TestRunner(unittest.TestCase):
+    def test_results(self):
+        lines = ["def sq(x) = { x * x }\n", "y = 3\n", "sq(y) + 1  10 / 4\n"]
+        self.assertEqual(list(run(lines)), [None, 3, 10, 2.5])
+
+    def test_statement_spanning_lines(self):
+        lines = ["x = 1 +\n", "2 *\n", "3\n"]
+        self.assertEqual(list(run(lines)), [7])
+
+    def test_results_stream_before_the_rest_is_read(self):
+        def lines():
+            yield "1 + 1\n"
+            yield "2 + 2\n"
+            raise AssertionError("read past the second line")
+
+        results = run(lines())
+        # The first statement can only end once the next line's first token
+        # shows it isn't continued, so one line of lookahead is all it takes
+        self.assertEqual(next(results), 2)
+
+    def test_unexpected_token(self):
+        with self.assertRaises(SyntaxError):
+            list(run(["1 )\n"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+import random
+import unittest
+from _tokenizer import Tokenizer
+from abstract_syntax_tree import Binary, Number, Unary
+from parser import Parser
+from stack_parser import StackParser
+
+
+def parse(parser_class, source):
+    try:
+        return repr(parser_class(Tokenizer(source).scan_tokens()).parse())
+    except SyntaxError:
+        return SyntaxError
+
+
+class TestStackParser(unittest.TestCase):
+    def assertSameTrees(self, source):
+        self.assertEqual(parse(StackParser, source), parse(Parser, source), source)
+
+    def test_same_trees_as_parser(self):
+        for source in [
+            "1 + 2 * 3 - 4 / 5",
+            "1 - 2 - 3",
+            "2 ** 3 ** 4",
+            "-2 ** 2",
+            "2 ** -3 ** 2",
+            "(1 + 2) * (3 - (4 / y))",
+            "x = f(1, g(2) ** 3, -z) / 2",
+            "def f(a, b) = { a * b + f() }",
+            "1 +",
+            "f(1,)",
+            "()",
+            "(1 + 2",
+            "f(1",
+            "f(1 2)",
+        ]:
+            self.assertSameTrees(source)
+
+    def test_random_token_sequences(self):
+        rng = random.Random(7)
+        vocabulary = ["1", "23", "x", "f", "+", "-", "*", "/", "**", "(", ")", ",", "="]
+        for _ in range(3000):
+            source = " ".join(rng.choice(vocabulary) for _ in range(rng.randrange(1, 12)))
+            self.assertSameTrees(source)
+
+    def test_deep_nesting(self):
+        depth = 20000
+        tokens = Tokenizer("(" * depth + "1" + ")" * depth).scan_tokens()
+        self.assertIsInstance(StackParser(tokens).parse()[0], Number)
+
+        expr = StackParser(Tokenizer("-" * depth + "1").scan_tokens()).parse()[0]
+        for _ in range(depth):
+            self.assertIsInstance(expr, Unary)
+            expr = expr.operand
+        self.assertIsInstance(expr, Number)
+
+        expr = StackParser(Tokenizer(" ** ".join(["2"] * depth)).scan_tokens()).parse()[0]
+        for _ in range(depth - 1):
+            self.assertIsInstance(expr, Binary)
+            self.assertEqual(expr.left.value, 2)
+            expr = expr.right
+        self.assertEqual(expr.value, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,7 @@
+import mmap
+import tempfile
 import unittest
-from _tokenizer import Tokenizer
+from _tokenizer import ByteTokenizer, Tokenizer
 from _token import TokenType
 
 
@@ -43,6 +45,65 @@ class TestTokenizer(unittest.TestCase):
         self.assertEqual(tokens[2].type, TokenType.NUMBER)
         self.assertEqual(tokens[-1].type, TokenType.EOF)
 
+    def test_table_engine_matches_scan_engine(self):
+        sources = [
+            "123",
+            "  7   -  4 ",
+            "x = 2 ** 10 == y",
+            "def add(a, b) = { a + b }\nadd(1, 2)",
+            "foo_1*(bar2/3)-_baz",
+            "1\u0663 + 2",
+            "",
+        ]
+        for source in sources:
+            expected = Tokenizer(source).scan_tokens()
+            actual = Tokenizer(source, engine="table").scan_tokens()
+            self.assertEqual(
+                [(t.type, t.lexeme, t.value) for t in actual],
+                [(t.type, t.lexeme, t.value) for t in expected],
+            )
+
+    def test_table_engine_unexpected_character(self):
+        with self.assertRaises(SyntaxError):
+            Tokenizer("1 + $", engine="table").scan_tokens()
+
+    def test_token_buffer_matches_token_list(self):
+        source = "def add(a, b) = { a + b }\nx = add(12, 3) ** 2 == y"
+        expected = [(t.type, t.lexeme, t.value) for t in Tokenizer(source).scan_tokens()]
+        for engine in Tokenizer.ENGINES:
+            tokens = Tokenizer(source, engine=engine).scan_tokens(buffer=True)
+            self.assertEqual(len(tokens), len(expected))
+            self.assertEqual([(t.type, t.lexeme, t.value) for t in tokens], expected)
+            self.assertEqual(tokens[-1].type, TokenType.EOF)
+
+    def test_byte_tokenizer_matches_tokenizer(self):
+        source = "def add(a, b) = { a + b }\nx = add(12, 3) ** 2 == y"
+        expected = [(t.type, t.lexeme, t.value) for t in Tokenizer(source).scan_tokens()]
+        data = source.encode("ascii")
+        for buffer in (data, bytearray(data), memoryview(data)):
+            tokens = ByteTokenizer(buffer).scan_tokens()
+            self.assertEqual([(t.type, t.lexeme, t.value) for t in tokens], expected)
+
+    def test_byte_tokenizer_mmap(self):
+        with tempfile.TemporaryFile() as f:
+            f.write(b"foo = 42\nfoo * foo")
+            f.flush()
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as source:
+                tokens = ByteTokenizer(source).scan_tokens()
+                self.assertEqual(tokens[0].lexeme, "foo")
+                self.assertEqual(tokens[2].value, 42)
+                # Identifier text is interned, not copied per occurrence
+                self.assertIs(tokens.lexeme_at(3), tokens.lexeme_at(5))
+                self.assertEqual(tokens[-1].type, TokenType.EOF)
+
+    def test_byte_tokenizer_unexpected_character(self):
+        with self.assertRaisesRegex(SyntaxError, "é"):
+            ByteTokenizer("1 + é".encode("utf-8")).scan_tokens()
+
+    def test_unknown_engine(self):
+        with self.assertRaises(ValueError):
+            Tokenizer("1", engine="fast")
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,80 @@
+import random
+import unittest
+from _tokenizer import Tokenizer
+from interpreter import Frame, Interpreter
+from parser import Parser
+from vectorized import np
+
+
+def parse(source):
+    return Parser(Tokenizer(source).scan_tokens()).parse()
+
+
+def row_by_row(interpreter, source, columns):
+    [statement] = parse(source)
+    results, variables = [], interpreter.variables
+    try:
+        for row in zip(*columns.values()):
+            interpreter.variables = Frame(variables, zip(columns, row))
+            results.append(interpreter.evaluate(statement))
+    finally:
+        interpreter.variables = variables
+    return results
+
+
+@unittest.skipIf(np is None, "needs numpy")
+class TestBatchEvaluator(unittest.TestCase):
+    def test_evaluates_functions_over_columns(self):
+        interpreter = Interpreter()
+        for statement in parse("k = 10 def f(x, y) = { x * y + k / 4 }"):
+            interpreter.evaluate(statement)
+        result = interpreter.evaluate_batch("f(x, y) - x", x=np.arange(5), y=np.array([1.5, 2, 3, 4, 5]))
+        self.assertEqual(result.dtype, np.float64)
+        self.assertEqual(result.tolist(), [2.5, 3.5, 6.5, 11.5, 18.5])
+        self.assertEqual(interpreter.evaluate_batch("x ** 2 + 1", x=[1, 2, 3]).tolist(), [2, 5, 10])
+        self.assertEqual(interpreter.batch.vectorized, 2)
+        self.assertNotIn("x", interpreter.variables)
+
+    def test_keeps_python_semantics(self):
+        interpreter = Interpreter()
+        big = np.array([2**62, 3, -(2**63)])
+        self.assertEqual(interpreter.evaluate_batch("x * 4 + 1", x=big).tolist(), [2**64 + 1, 13, -(2**65) + 1])
+        self.assertEqual(interpreter.evaluate_batch("-x", x=big).tolist(), [-(2**62), -3, 2**63])
+        self.assertEqual(interpreter.evaluate_batch("x ** y", x=[2, 3, 2], y=[70, -1, 3]).tolist(), [2**70, 1 / 3, 8])
+        self.assertEqual(interpreter.evaluate_batch("x / 3", x=[2**60 + 1, 1]).tolist(), [(2**60 + 1) / 3, 1 / 3])
+        self.assertEqual(interpreter.evaluate_batch("x ** (1 / 2)", x=[-4.0, 4.0]).tolist(), [(-4.0) ** 0.5, 2.0])
+        self.assertEqual(interpreter.batch.row_by_row, 1)
+
+        with self.assertRaises(ZeroDivisionError):
+            interpreter.evaluate_batch("1 / x", x=[1, 0])
+        with self.assertRaises(OverflowError):
+            interpreter.evaluate_batch("x ** 400", x=[10.0])
+        with self.assertRaises(KeyError):
+            interpreter.evaluate_batch("x + z", x=[1])
+        with self.assertRaises(ValueError):
+            interpreter.evaluate_batch("x + y", x=[1], y=[1, 2])
+
+    def test_same_results_as_each_row(self):
+        rng = random.Random(1234)
+        interpreter = Interpreter()
+        for statement in parse("def f(a, b) = { a * b - a / (b + 1 / 2) } def g(a) = { f(a, a ** 2) }"):
+            interpreter.evaluate(statement)
+        sources = ["x + y * 3", "f(x, y) ** 2", "g(x) - -y", "x ** n", "x / y", "(x * y) ** 3 + f(y, n)"]
+        values = [0, 1, -1, 7, 2**31, -(2**40), 2**62, 0.5, -2.25, 1e300, 3.0]
+        powers = [0, 1, 2, 3, -1, -2, 0.5, -1.5, 2.0]
+        for _ in range(50):
+            columns = {name: [rng.choice(values) for _ in range(20)] for name in "xy"}
+            columns["n"] = [rng.choice(powers) for _ in range(20)]
+            for source in sources:
+                try:
+                    expected = row_by_row(interpreter, source, columns)
+                except Exception as error:
+                    with self.assertRaises(type(error)):
+                        interpreter.evaluate_batch(source, **columns)
+                    continue
+                result = interpreter.evaluate_batch(source, **columns).tolist()
+                self.assertEqual([repr(value) for value in result], [repr(value) for value in expected], source)
+
+
+if __name__ == "__main__":
+    unittest.main()
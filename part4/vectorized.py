@@ -0,0 +1,212 @@
+from _token import TokenType
+from _tokenizer import Tokenizer
+from abstract_syntax_tree import Assignment, Binary, Call, Expr, Number, Unary, Variable
+from interpreter import Frame, Interpreter
+from parser import Parser
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+_INT64_LIMIT = 2**63
+_FLOAT_EXACT = 2**53  # Every int up to this size is exactly a float
+
+
+class _RowByRow(Exception):
+    """Raised when a column-wise operation can't give what a row-by-row one would."""
+
+
+class BatchEvaluator:
+    """
+    Evaluates a statement once per row of some columns of inputs, with one
+    NumPy operation per node over whole columns rather than one Python
+    operation per node per row.
+
+    interpreter: Interpreter - Supplies the functions, and the variables
+        the columns don't.
+    vectorized: int - How many batches were evaluated column by column.
+    row_by_row: int - How many batches fell back to evaluating each row.
+
+    Each row is evaluated as the tree engine would evaluate the statement
+    with the row's values as variables in front of the interpreter's (in a
+    Frame, so an assignment doesn't outlive the row). Values are int64 or
+    float64 columns while that gives exactly what Python's int and float
+    would: a +, -, * or / of ints whose result might not fit, or might not
+    be exact, and a ** of ints with a negative exponent, switch to a
+    column of Python objects, which NumPy operates on one at a time. Float
+    ** goes through Python too, since NumPy's power can differ in the last
+    bit. Anything a row would raise on (a division by zero, a float
+    overflow, a missing variable), and defs, which act per row, make the
+    whole batch fall back to evaluating each row with the interpreter, so
+    it gives the same results and raises the same errors as the loop.
+
+    The result is an int64 or float64 column if every row gave an int64 or
+    a float, else a column of Python objects. Nothing is charged to a
+    Budget, so Interpreter.evaluate_batch() refuses a budgeted session.
+    """
+
+    def __init__(self, interpreter: Interpreter):
+        if np is None:
+            raise ImportError("Batch evaluation needs numpy.")
+        self.interpreter = interpreter
+        self.vectorized = 0
+        self.row_by_row = 0
+
+    def evaluate(self, statement, columns: dict):
+        """Return the results of evaluating statement (or its source) with each row of the columns."""
+        if isinstance(statement, str):
+            statements = Parser(Tokenizer(statement).scan_tokens()).parse()
+            if len(statements) != 1:
+                raise ValueError(f"Expected one statement to batch, but got {len(statements)}.")
+            statement = statements[0]
+
+        columns = {name: _column(values) for name, values in columns.items()}
+        sizes = {len(column) for column in columns.values()}
+        if len(sizes) > 1:
+            raise ValueError("Batch columns must all have the same length.")
+        size = sizes.pop() if sizes else 1
+
+        if size:
+            try:
+                with np.errstate(all="ignore"):
+                    result = self._evaluate(statement, Frame(self.interpreter.variables, columns), size)
+            except (_RowByRow, ArithmeticError, LookupError, RuntimeError, TypeError, ValueError):
+                pass
+            else:
+                self.vectorized += 1
+                return _column(result.tolist()) if result.dtype == object else result
+
+        self.row_by_row += 1
+        return self._evaluate_rows(statement, columns, size)
+
+    def _evaluate_rows(self, statement: Expr, columns: dict, size: int):
+        """Evaluate statement for each row in turn, with the tree engine."""
+        rows = Interpreter()
+        rows.functions = self.interpreter.functions
+        names = list(columns)
+        values = [column.tolist() for column in columns.values()]
+        results = []
+        for row in range(size):
+            bindings = [(name, column[row]) for name, column in zip(names, values)]
+            rows.variables = Frame(self.interpreter.variables, bindings)
+            results.append(rows.evaluate(statement))
+        return _column(results)
+
+    def _evaluate(self, expr: Expr, variables: dict, size: int):
+        if isinstance(expr, Number):
+            return _filled(expr.value, size)
+
+        if isinstance(expr, Variable):
+            value = variables[expr.name]
+            return value if isinstance(value, np.ndarray) else _filled(value, size)
+
+        if isinstance(expr, Unary):
+            operand = self._evaluate(expr.operand, variables, size)
+            if expr.operator == TokenType.PLUS:
+                return operand
+            if expr.operator == TokenType.MINUS:
+                if operand.dtype == np.int64 and _magnitude(operand) >= _INT64_LIMIT:
+                    operand = operand.astype(object)
+                return np.negative(operand)
+
+        if isinstance(expr, Binary):
+            left = self._evaluate(expr.left, variables, size)
+            right = self._evaluate(expr.right, variables, size)
+            return _binary(expr.operator, left, right)
+
+        if isinstance(expr, Assignment):
+            value = variables[expr.name] = self._evaluate(expr.value, variables, size)
+            return value
+
+        if isinstance(expr, Call):
+            function = self.interpreter._lookup_function(expr.callee, len(expr.arguments))
+            arg_vals = [self._evaluate(arg, variables, size) for arg in expr.arguments]
+            return self._evaluate(function.body, Frame(variables, zip(function.params, arg_vals)), size)
+
+        # A def runs once per row
+        raise _RowByRow(expr)
+
+
+def _binary(operator: TokenType, left, right):
+    """Apply operator to two columns, giving what Python would give row by row."""
+    if left.dtype == object or right.dtype == object:
+        left, right = left.astype(object), right.astype(object)
+    elif left.dtype == np.int64 and right.dtype == np.int64:
+        left_size, right_size = _magnitude(left), _magnitude(right)
+        if operator in (TokenType.PLUS, TokenType.MINUS):
+            exact = left_size + right_size < _INT64_LIMIT
+        elif operator == TokenType.MULTIPLY:
+            exact = left_size * right_size < _INT64_LIMIT
+        elif operator == TokenType.DIVIDE:
+            exact = left_size <= _FLOAT_EXACT and right_size <= _FLOAT_EXACT
+        elif operator == TokenType.EXPONENT:
+            # |left| ** right < 2 ** (bits * right); a negative power is a float
+            exponent = int(right.max())
+            exact = int(right.min()) >= 0 and (left_size <= 1 or left_size.bit_length() * exponent < 63)
+        else:
+            exact = True
+        if not exact:
+            left, right = left.astype(object), right.astype(object)
+
+    if operator == TokenType.PLUS:
+        return np.add(left, right)
+    if operator == TokenType.MINUS:
+        return np.subtract(left, right)
+    if operator == TokenType.MULTIPLY:
+        return np.multiply(left, right)
+    if operator == TokenType.DIVIDE:
+        if left.dtype != object and not right.all():
+            raise _RowByRow("division by zero")
+        return np.true_divide(left, right)
+    if operator == TokenType.EXPONENT:
+        if left.dtype != object and np.float64 in (left.dtype, right.dtype):
+            if ((left < 0) & (right != np.floor(right))).any():
+                raise _RowByRow("complex power")
+            # Python raises on overflow and on zero to a negative power
+            return np.array(np.power(left.astype(object), right.astype(object)), dtype=np.float64)
+        return np.power(left, right)
+    raise _RowByRow(operator)
+
+
+def _magnitude(column) -> int:
+    """Return the largest absolute value in an int64 column, as a Python int."""
+    return max(int(column.max()), -int(column.min()))
+
+
+def _filled(value, size: int):
+    """Return a column of size copies of value."""
+    if type(value) is int and -_INT64_LIMIT <= value < _INT64_LIMIT:
+        return np.full(size, value, dtype=np.int64)
+    if type(value) is float:
+        return np.full(size, value, dtype=np.float64)
+    column = np.empty(size, dtype=object)
+    column.fill(value)
+    return column
+
+
+def _column(values):
+    """
+    Return values as an int64 or float64 column if they are all ints that
+    fit or all floats, else as a column of Python objects.
+    """
+    if isinstance(values, np.ndarray):
+        if values.ndim != 1:
+            raise ValueError("Batch columns must be one-dimensional.")
+        if values.dtype.kind == "i":
+            return values.astype(np.int64, copy=False)
+        if values.dtype.kind == "f":
+            return values.astype(np.float64, copy=False)
+        values = values.tolist()
+
+    values = list(values)
+    if all(type(value) is int for value in values):
+        try:
+            return np.array(values, dtype=np.int64)
+        except OverflowError:
+            pass
+    elif all(type(value) is float for value in values):
+        return np.array(values, dtype=np.float64)
+    column = np.empty(len(values), dtype=object)
+    column[:] = values
+    return column